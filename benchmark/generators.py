@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 03:40 PM +0200
+'''
+Seeded generators for synthetic netlists, wirelists and pin-assignment
+workbooks. The same (scale, seed) always produces the same output.
+'''
+
+import random
+
+from string import ascii_uppercase
+
+
+##############
+# Topologies #
+##############
+
+DCB_PINS = ['{}{}'.format(r, c) for r in ascii_uppercase[:11]
+            for c in range(1, 41)]
+PT_PINS = [str(i) for i in range(1, 101)]
+
+
+def connector_pins(prefix, pins):
+    '''
+    Yield (connector, pin) for an unbounded number of connectors.
+    '''
+    idx = 0
+    while True:
+        for pin in pins:
+            yield (prefix + str(idx), pin)
+        idx += 1
+
+
+def rc_chains(num_nodes, chain_length=8, seed=0):
+    '''
+    Return a netlist, i.e. {netname: [(component, pin), ...]}, with about
+    'num_nodes' nodes in total.
+
+    Each net has one DCB and one PigTail connector pin. Nets are linked into
+    chains of 'chain_length' by resistors and capacitors, which makes up the
+    topology that CurrentFlow hops through.
+    '''
+    rng = random.Random(seed)
+    dcb_pins = connector_pins('JD', DCB_PINS)
+    pt_pins = connector_pins('JP', PT_PINS)
+
+    nets = {}
+    num_r = num_c = 0
+    prev = None
+    idx = 0
+    size = 0
+
+    while size < num_nodes:
+        netname = 'NET_{:07d}_{}'.format(
+            idx, rng.choice(['P', 'N', 'GND', '1V5', '2V5', 'THERM']))
+        nodes = [next(dcb_pins), next(pt_pins)]
+
+        if prev is not None and idx % chain_length:
+            if rng.random() < 0.7:
+                num_r += 1
+                part = 'R' + str(num_r)
+            else:
+                num_c += 1
+                part = 'C' + str(num_c)
+            nets[prev].append((part, '1'))
+            nodes.append((part, '2'))
+            size += 1
+
+        nets[netname] = nodes
+        prev = netname
+        idx += 1
+        size += len(nodes)
+
+    return nets
+
+
+#################
+# Text netlists #
+#################
+
+def pcad_netlist(nets):
+    '''
+    Serialize a netlist to the Pcad format read by PcadNaiveReader.
+    '''
+    components = sorted({c for nodes in nets.values() for c, _ in nodes})
+
+    lines = ['(netlist "Netlist_1"']
+    for c in components:
+        lines.append('  (compInst "{}"'.format(c))
+        lines.append('    (compRef "{}")'.format(c.rstrip('0123456789')))
+        lines.append('  )')
+
+    for netname, nodes in nets.items():
+        lines.append('  (net "{}"'.format(netname))
+        for c, p in nodes:
+            lines.append('    (node "{}" "{}")'.format(c, p))
+        lines.append('  )')
+
+    lines.append(')')
+    return '\n'.join(lines) + '\n'
+
+
+def wirelist(nets):
+    '''
+    Serialize a netlist to the wirelist format read by WirelistNaiveReader.
+    '''
+    components = sorted({c for nodes in nets.values() for c, _ in nodes})
+
+    lines = ['Wire List', '', '<<< Component List >>>', '']
+    for c in components:
+        lines.append('        {:<10} {:<20}'.format(c, c.rstrip('0123456789')))
+
+    lines += ['', '<<< Wire List >>>', '',
+              '  NODE  REFERENCE  PIN #   PIN NAME       PIN TYPE    '
+              'PART VALUE', '']
+    for idx, (netname, nodes) in enumerate(nets.items(), 1):
+        lines.append('[{:05d}] {}'.format(idx, netname))
+        for c, p in nodes:
+            lines.append('        {:<10} {:<7} {:<14} {:<11} {}'.format(
+                c, p, p, 'PASSIVE', c))
+        lines.append('')
+
+    return '\n'.join(lines) + '\n'
+
+
+#########################
+# Pin-assignment sheets #
+#########################
+
+PIN_ASSIGNMENT_HEADERS = ['Connector', 'Pin', 'Signal ID', 'Note']
+
+
+def pin_assignment(num_rows, seed=0):
+    '''
+    Return [headers, row, ...] of a pin-assignment table.
+    '''
+    rng = random.Random(seed)
+    pins = connector_pins('JP', PT_PINS)
+    rows = [PIN_ASSIGNMENT_HEADERS]
+
+    for idx in range(num_rows):
+        connector, pin = next(pins)
+        signal = rng.choice(['ELK_{}_P', 'ELK_{}_N', 'GND', 'TFC_{}',
+                             'THERM_{}', 'LV_{}'])
+        note = rng.choice([None, None, None, 'Depopulated'])
+        rows.append([connector, pin, signal.format(idx), note])
+
+    return rows
+
+
+def pin_assignment_workbook(filename, num_rows, sheets=1, seed=0):
+    '''
+    Write a workbook with 'sheets' pin-assignment sheets, named '0', '1', ...
+    Return the cell range of each sheet.
+    '''
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    for s in range(sheets):
+        ws = wb.create_sheet(str(s))
+        for row in pin_assignment(num_rows, seed+s):
+            ws.append(row)
+    wb.save(filename)
+
+    return 'A1:D{}'.format(num_rows+1)
+
+
+def pin_assignment_dataset(num_rows, seed=0):
+    '''
+    Return {connector: [entry, ...]}, the input of SelectorPD.
+    '''
+    headers, *rows = pin_assignment(num_rows, seed)
+    dataset = {}
+
+    for row in rows:
+        entry = dict(zip(headers, row))
+        dataset.setdefault(entry['Connector'], []).append(entry)
+
+    return dataset
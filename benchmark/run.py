@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 04:05 PM +0200
+'''
+Run the benchmarks and write time and peak memory of each into a JSON file.
+
+Usage:
+    ./run.py --scale 100000 --output results.json
+    ./run.py --scale 100000 --output new.json --compare results.json
+'''
+
+import sys
+import json
+import platform
+import subprocess
+import tracemalloc
+
+from argparse import ArgumentParser
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyUTM.io import PcadNaiveReader, PcadReader, WirelistNaiveReader
+from pyUTM.io import XLReader, XLWriter, BinaryWriter, BinaryReader
+from pyUTM.io import NetNodeGen, write_to_csv, csv_line
+from pyUTM.sim import CurrentFlow
+from pyUTM.selection import RulePD, SelectorPD, RuleNet, SelectorNet
+from pyUTM.datatype import NetNode
+
+import generators as gen
+
+
+############
+# Registry #
+############
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    '''
+    Register a benchmark. The decorated function is called as
+        func(workdir, scale, seed)
+    to prepare the inputs, and must return the callable to be timed.
+    '''
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+#########
+# Rules #
+#########
+
+class RulePDDepop(RulePD):
+    def match(self, data, connector):
+        return data['Note'] == 'Depopulated'
+
+    def process(self, data, connector):
+        return (NetNode(PT=connector, PT_PIN=data['Pin']),
+                self.prop_gen(data['Signal ID'], attr='_DEPOP_'))
+
+
+class RulePDGround(RulePD):
+    def match(self, data, connector):
+        return data['Signal ID'] == 'GND'
+
+    def process(self, data, connector):
+        return (NetNode(PT=connector, PT_PIN=data['Pin']),
+                self.prop_gen('GND'))
+
+
+class RulePDDefault(RulePD):
+    def match(self, data, connector):
+        return True
+
+    def process(self, data, connector):
+        return (NetNode(PT=connector, PT_PIN=data['Pin']),
+                self.prop_gen('{}_{}'.format(connector, data['Signal ID'])))
+
+
+class RuleNetGround(RuleNet):
+    def match(self, node):
+        return self.node_dict[node]['NETNAME'].endswith('GND')
+
+
+class RuleNetUnpaired(RuleNet):
+    def match(self, node):
+        return node.DCB is None or node.PT is None
+
+    def process(self, node):
+        return ('Unpaired', self.node_to_str(node))
+
+
+class RuleNetDefault(RuleNet):
+    def match(self, node):
+        return True
+
+    def process(self, node):
+        return ('Checked', self.node_to_str(node))
+
+
+##############
+# Benchmarks #
+##############
+
+@benchmark('PcadNaiveReader.read')
+def bench_pcad_naive_reader(workdir, scale, seed):
+    filename = workdir / 'netlist.net'
+    filename.write_text(gen.pcad_netlist(gen.rc_chains(scale, seed=seed)))
+    return lambda: PcadNaiveReader(filename).read()
+
+
+@benchmark('PcadReader.read')
+def bench_pcad_reader(workdir, scale, seed):
+    filename = workdir / 'netlist.net'
+    filename.write_text(gen.pcad_netlist(gen.rc_chains(scale, seed=seed)))
+    return lambda: PcadReader(filename).read(CurrentFlow())
+
+
+@benchmark('WirelistNaiveReader.read')
+def bench_wirelist_reader(workdir, scale, seed):
+    filename = workdir / 'netlist.wirelist'
+    filename.write_text(gen.wirelist(gen.rc_chains(scale, seed=seed)))
+    return lambda: WirelistNaiveReader(filename).read()
+
+
+@benchmark('XLReader.read')
+def bench_xl_reader(workdir, scale, seed):
+    filename = workdir / 'pins.xlsx'
+    cell_range = gen.pin_assignment_workbook(filename, scale, seed=seed)
+    return lambda: XLReader(filename).read(['0'], cell_range)
+
+
+@benchmark('BinaryReader.read')
+def bench_binary_reader(workdir, scale, seed):
+    filename = workdir / 'nodes.bin'
+    BinaryWriter(filename).write(
+        NetNodeGen().do(gen.rc_chains(scale, seed=seed)))
+
+    def run():
+        with BinaryReader(filename).read() as nodes:
+            return dict(nodes.items())
+    return run
+
+
+@benchmark('CurrentFlow.do')
+def bench_current_flow(workdir, scale, seed):
+    nets = gen.rc_chains(scale, seed=seed)
+    return lambda: CurrentFlow().do(nets)
+
+
+@benchmark('CurrentFlow.do[iterative]')
+def bench_current_flow_iterative(workdir, scale, seed):
+    nets = gen.rc_chains(scale, seed=seed)
+    return lambda: CurrentFlow(iterative=True).do(nets)
+
+
+@benchmark('NetNodeGen.do')
+def bench_netnodegen(workdir, scale, seed):
+    nets = gen.rc_chains(scale, seed=seed)
+    return lambda: NetNodeGen().do(nets)
+
+
+@benchmark('SelectorPD.do')
+def bench_selector_pd(workdir, scale, seed):
+    dataset = gen.pin_assignment_dataset(scale, seed=seed)
+    rules = [RulePDDepop(), RulePDGround(), RulePDDefault()]
+    return lambda: SelectorPD(dataset, rules).do()
+
+
+@benchmark('SelectorNet.do')
+def bench_selector_net(workdir, scale, seed):
+    nodes = NetNodeGen().do(gen.rc_chains(scale, seed=seed))
+    rules = [cls(nodes, list(nodes), {}) for cls in
+             (RuleNetGround, RuleNetUnpaired, RuleNetDefault)]
+    return lambda: SelectorNet(nodes, rules).do()
+
+
+@benchmark('write_to_csv')
+def bench_csv_writer(workdir, scale, seed):
+    nodes = NetNodeGen().do(gen.rc_chains(scale, seed=seed))
+    return lambda: write_to_csv(workdir / 'nodes.csv', nodes, csv_line)
+
+
+@benchmark('XLWriter.write')
+def bench_xl_writer(workdir, scale, seed):
+    data = {'0': gen.pin_assignment(scale, seed=seed)}
+    return lambda: XLWriter(workdir / 'out.xlsx').write(data)
+
+
+@benchmark('BinaryWriter.write')
+def bench_binary_writer(workdir, scale, seed):
+    nodes = NetNodeGen().do(gen.rc_chains(scale, seed=seed))
+    return lambda: BinaryWriter(workdir / 'out.bin').write(nodes)
+
+
+##########
+# Runner #
+##########
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+
+    # Measured separately, as tracemalloc slows down the code under test.
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time': min(times),
+        'median': median(times),
+        'times': times,
+        'peak_memory': peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, scale, seed, repeat):
+    results = {}
+
+    for name in names:
+        with TemporaryDirectory() as tmp:
+            func = BENCHMARKS[name](Path(tmp), scale, seed)
+            results[name] = measure(func, repeat)
+
+        print('{:<28} {:>10.4f} s {:>10.1f} MiB'.format(
+            name, results[name]['time'],
+            results[name]['peak_memory'] / 2**20))
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': scale,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new):
+    if old['meta']['scale'] != new['meta']['scale']:
+        print('WARNING: Comparing results of different scales.')
+
+    print('{:<28} {:>10} {:>10}'.format('benchmark', 'time', 'memory'))
+    for name, result in new['results'].items():
+        try:
+            ref = old['results'][name]
+        except KeyError:
+            continue
+
+        print('{:<28} {:>9.2f}x {:>9.2f}x'.format(
+            name, result['time'] / ref['time'],
+            result['peak_memory'] / max(ref['peak_memory'], 1)))
+
+
+def parse_input(descr='Run pyUTM benchmarks.'):
+    parser = ArgumentParser(description=descr)
+
+    parser.add_argument('-s', '--scale', type=int, default=10000,
+                        help='approximate number of nodes/rows per input.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default='results.json',
+                        help='JSON file to write the results to.')
+    parser.add_argument('-c', '--compare',
+                        help='JSON file of a previous run to compare with.')
+    parser.add_argument('-b', '--benchmarks', nargs='+',
+                        choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        metavar='NAME', help='benchmarks to run.')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_input()
+    output = run(args.benchmarks, args.scale, args.seed, args.repeat)
+
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), output)
@@ -1,10 +1,30 @@
 __name__ = 'pyUTM'
 __version__ = '0.2.0'
 
-import pyUTM.common
-import pyUTM.datatype
-import pyUTM.io
-import pyUTM.selection
-import pyUTM.sim
+import importlib
 
-import pyUTM.legacy
+# Submodules are imported on first attribute access, so that scripts only pay
+# for the dependencies they actually use.
+submodules = (
+    'cli',
+    'common',
+    'datatype',
+    'instrument',
+    'io',
+    'legacy',
+    'netlist',
+    'selection',
+    'sim',
+    'store',
+)
+
+
+def __getattr__(name):
+    if name in submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        "module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(submodules))
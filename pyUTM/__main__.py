@@ -0,0 +1,5 @@
+import sys
+
+from pyUTM.cli import main
+
+sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 05:50 PM +0200
+'''
+Generate NetNode mappings from many netlists in parallel:
+
+    pyUTM manifest.yml -j 4
+
+The manifest is a YAML list of jobs:
+
+    - input: comet_db.net         # Pcad netlist
+      output: comet_db.csv        # .csv or .bin
+    - input: true_ppp.wirelist    # Wirelist, detected by extension
+      output: true_ppp.csv
+      dedupe_aliases: true
+
+Relative paths are relative to the manifest. Jobs whose input, options and
+pyUTM version are unchanged since the last successful run are skipped.
+'''
+
+import json
+import hashlib
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from . import __version__
+from .instrument import Recorder, span
+
+STAGES = ('read', 'hop', 'generate', 'write')
+
+JOB_DEFAULTS = {
+    'format': None,           # 'pcad' or 'wirelist'; guessed if None
+    'hop': True,              # Merge equivalent nets with CurrentFlow
+    'section': 'Wire List',   # Wirelist section to read
+    'dedupe_aliases': False,  # See NetNodeGen.do
+}
+
+
+############
+# Manifest #
+############
+
+def guess_format(filename):
+    return 'wirelist' if Path(filename).suffix in ('.wirelist', '.wir') \
+        else 'pcad'
+
+
+def load_manifest(filename):
+    import yaml
+
+    base = Path(filename).resolve().parent
+    with open(filename) as f:
+        entries = yaml.safe_load(f) or []
+
+    jobs = []
+    for entry in entries:
+        unknown = set(entry) - set(JOB_DEFAULTS) - {'input', 'output'}
+        if unknown:
+            raise ValueError('Unknown job option(s): {}'.format(
+                ', '.join(sorted(unknown))))
+
+        job = dict(JOB_DEFAULTS, **entry)
+        job['input'] = str(base / job['input'])
+        job['output'] = str(base / job['output'])
+        if job['format'] is None:
+            job['format'] = guess_format(job['input'])
+        jobs.append(job)
+
+    return jobs
+
+
+def job_hash(job):
+    sha1 = hashlib.sha1()
+    with open(job['input'], 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+
+    sha1.update(__version__.encode('utf-8'))
+    sha1.update(json.dumps(job, sort_keys=True).encode('utf-8'))
+    return sha1.hexdigest()
+
+
+def load_state(filename):
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+############
+# Pipeline #
+############
+
+def run_job(job):
+    '''
+    Run read -> hop -> generate -> write for a single job. Return
+    (error, {stage: wall time}); 'error' is None on success.
+    '''
+    from .io import PcadNaiveReader, PcadReader, WirelistNaiveReader
+    from .io import NetNodeGen, BinaryWriter, write_to_csv, csv_line
+    from .sim import CurrentFlow
+
+    try:
+        with Recorder() as rec:
+            with span('read'):
+                if job['format'] == 'wirelist':
+                    nets = WirelistNaiveReader(job['input']).read(
+                        job['section'])
+                else:
+                    nets = PcadNaiveReader(job['input']).read()
+
+            if job['hop']:
+                with span('hop'):
+                    PcadReader.make_equivalent_nets_identical(
+                        nets, CurrentFlow().do(nets))
+
+            with span('generate'):
+                nodes = NetNodeGen().do(nets, job['dedupe_aliases'])
+
+            with span('write'):
+                Path(job['output']).parent.mkdir(parents=True, exist_ok=True)
+                if job['output'].endswith('.bin'):
+                    BinaryWriter(job['output']).write(nodes)
+                else:
+                    write_to_csv(job['output'], nodes, csv_line)
+
+    except Exception as err:
+        return '{}: {}'.format(type(err).__name__, err), {}
+
+    summary = rec.summary()
+    return None, {s: summary[s]['wall'] for s in STAGES if s in summary}
+
+
+def run_manifest(manifest, state_file=None, workers=None, force=False,
+                 report=print):
+    '''
+    Run all out-of-date jobs of 'manifest'. Return the number of failed jobs.
+    '''
+    jobs = load_manifest(manifest)
+    if state_file is None:
+        state_file = Path(manifest).with_suffix('.state.json')
+    state = load_state(state_file)
+
+    pending = []
+    num_built = num_failed = num_skipped = 0
+    start = perf_counter()
+
+    for job in jobs:
+        try:
+            digest = job_hash(job)
+        except OSError as err:
+            num_failed += 1
+            report('{:<8} {}: {}'.format('failed', job['output'], err))
+            continue
+
+        if not force and Path(job['output']).exists() and \
+                state.get(job['output']) == digest:
+            num_skipped += 1
+            report('{:<8} {}'.format('skipped', job['output']))
+        else:
+            pending.append((job, digest))
+
+    if pending:
+        with ProcessPoolExecutor(workers) as executor:
+            results = executor.map(run_job, [job for job, _ in pending])
+
+            for (job, digest), (error, timings) in zip(pending, results):
+                if error is not None:
+                    num_failed += 1
+                    state.pop(job['output'], None)
+                    report('{:<8} {}: {}'.format('failed', job['output'],
+                                                 error))
+                else:
+                    num_built += 1
+                    state[job['output']] = digest
+                    report('{:<8} {} ({:.3f} s: {})'.format(
+                        'built', job['output'], sum(timings.values()),
+                        ', '.join('{} {:.3f} s'.format(s, t)
+                                  for s, t in timings.items())))
+
+        with open(state_file, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+
+    report('{} built, {} failed, {} skipped in {:.3f} s'.format(
+        num_built, num_failed, num_skipped,
+        perf_counter() - start))
+
+    return num_failed
+
+
+#######
+# CLI #
+#######
+
+def parse_input(argv=None, descr='Generate NetNode mappings from netlists.'):
+    parser = ArgumentParser(description=descr)
+
+    parser.add_argument('manifest', help='YAML manifest of jobs.')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='number of worker processes.')
+    parser.add_argument('-s', '--state', default=None,
+                        help='file to store input hashes in; defaults to '
+                        '<manifest>.state.json.')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='rebuild all outputs.')
+    parser.add_argument('-V', '--version', action='version',
+                        version='pyUTM ' + __version__)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_input(argv)
+    num_failed = run_manifest(args.manifest, args.state, args.jobs,
+                              args.force)
+    return 1 if num_failed else 0
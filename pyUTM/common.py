@@ -3,7 +3,9 @@
 # License: BSD 2-clause
 # Last Change: Thu Dec 17, 2020 at 02:52 AM +0100
 
-from collections import defaultdict
+from collections import defaultdict, namedtuple, OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 
 #############
 # Constants #
@@ -298,6 +300,319 @@ all_pepis = {
 }
 
 
+##################
+# PEPI catalogue #
+##################
+
+PepiSlot = namedtuple('PepiSlot', ['pepi', 'stv_bp', 'stv_ut', 'bp_var',
+                                   'bp_idx', 'bp_type'])
+
+
+class PepiCatalogue(object):
+    '''
+    Frozen, indexed view of a PEPI table such as all_pepis.
+
+    Every field of PepiSlot is indexed, so queries like
+        catalogue.query(stv_ut='UTaX_3C')
+        catalogue.query(bp_var='gamma', bp_idx='outer', bp_type='m')
+    are hash lookups rather than linear scans. Queries return tuples of
+    PepiSlot.
+    '''
+
+    __slots__ = ('slots', 'indexes', '_cache')
+
+    def __init__(self, pepis=all_pepis):
+        slots = tuple(PepiSlot(pepi=pepi, **slot)
+                      for pepi, lst in pepis.items() for slot in lst)
+
+        indexes = {}
+        for field in PepiSlot._fields:
+            idx = defaultdict(list)
+            for slot in slots:
+                idx[getattr(slot, field)].append(slot)
+            indexes[field] = MappingProxyType(
+                {k: tuple(v) for k, v in idx.items()})
+
+        object.__setattr__(self, 'slots', slots)
+        object.__setattr__(self, 'indexes', MappingProxyType(indexes))
+        object.__setattr__(self, '_cache', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is frozen'.format(self.__class__.__name__))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def query(self, **kwargs):
+        if not kwargs:
+            return self.slots
+
+        key = frozenset(kwargs.items())
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        try:
+            candidates = sorted((self.indexes[k].get(v, ()) for k, v in
+                                 kwargs.items()), key=len)
+        except KeyError as err:
+            raise ValueError('Unknown field: {}'.format(err.args[0]))
+
+        result = candidates[0]
+        if len(candidates) > 1:
+            rest = [set(c) for c in candidates[1:]]
+            result = tuple(s for s in result if all(s in r for r in rest))
+
+        self._cache[key] = result
+        return result
+
+    def get(self, **kwargs):
+        '''
+        Like self.query, but expect exactly one matching slot.
+        '''
+        result = self.query(**kwargs)
+        if len(result) != 1:
+            raise KeyError('{} slots match {}'.format(len(result), kwargs))
+        return result[0]
+
+
+######################
+# Depopulation index #
+######################
+
+class DepopIndex(object):
+    '''
+    Compiled form of a depopulation table, e.g. jp_depop_true or jd_depop.
+
+    For each connector, the tri-state status across all variants is packed
+    into two bitmasks, one for depopulated ('True') and one for nonexistent
+    ('None') connectors. Bit i corresponds to self.variants[i].
+    '''
+
+    def __init__(self, table):
+        self.variants = tuple(next(iter(table.values())).keys())
+        self.bits = {v: 1 << i for i, v in enumerate(self.variants)}
+
+        self.depop_mask = {}
+        self.absent_mask = {}
+        for conn, status in table.items():
+            depop = absent = 0
+            for v, s in status.items():
+                if s is True:
+                    depop |= self.bits[v]
+                elif s is None:
+                    absent |= self.bits[v]
+            self.depop_mask[conn] = depop
+            self.absent_mask[conn] = absent
+
+        self.depopulated = {v: frozenset(
+            c for c, m in self.depop_mask.items() if m & b)
+            for v, b in self.bits.items()}
+        self.absent = {v: frozenset(
+            c for c, m in self.absent_mask.items() if m & b)
+            for v, b in self.bits.items()}
+        self.removed = {v: self.depopulated[v] | self.absent[v]
+                        for v in self.variants}
+
+        self._node_fields = {}
+
+    def __contains__(self, conn):
+        return conn in self.depop_mask
+
+    def status(self, conn, variant):
+        bit = self.bits[variant]
+        if self.absent_mask[conn] & bit:
+            return None
+        return bool(self.depop_mask[conn] & bit)
+
+    def variants_of(self, mask):
+        return [v for v, b in self.bits.items() if mask & b]
+
+    def connectors(self, node):
+        '''
+        Return the connectors of a node that are known to this index.
+        '''
+        if isinstance(node, str):
+            return (node,) if node in self.depop_mask else ()
+
+        node_type = type(node)
+        try:
+            idx = self._node_fields[node_type]
+        except KeyError:
+            idx = tuple(i for i, f in enumerate(node_type._fields)
+                        if not f.endswith('_PIN'))
+            self._node_fields[node_type] = idx
+
+        return tuple(node[i] for i in idx if node[i] in self.depop_mask)
+
+    def group(self, nodes):
+        groups = defaultdict(set)
+        for n in nodes:
+            for c in self.connectors(n):
+                groups[c].add(n)
+        return groups
+
+    def masks(self, nodes):
+        '''
+        Return {node: (depop_mask, absent_mask)} for all variants at once.
+        '''
+        result = {}
+        for n in nodes:
+            depop = absent = 0
+            for c in self.connectors(n):
+                depop |= self.depop_mask[c]
+                absent |= self.absent_mask[c]
+            result[n] = (depop, absent)
+        return result
+
+    def filter(self, nodes, variant, groups=None):
+        '''
+        Return the set of nodes that are fully populated in 'variant'.
+        '''
+        groups = self.group(nodes) if groups is None else groups
+        removed = set()
+        for c in self.removed[variant]:
+            removed |= groups.get(c, set())
+        return set(nodes) - removed
+
+    def filter_all(self, nodes):
+        '''
+        Return {variant: populated_nodes} for all variants.
+        '''
+        groups = self.group(nodes)
+        return {v: self.filter(nodes, v, groups) for v in self.variants}
+
+
+#######################
+# Connector remapping #
+#######################
+
+def connector_sort_key(name):
+    head = name.rstrip('0123456789')
+    tail = name[len(head):]
+    return (head, int(tail) if tail else -1)
+
+
+class ConnectorPermutation(object):
+    '''
+    A compiled permutation over connector names.
+
+    The permutation maps each key of 'table' to its value, and all other
+    connectors to themselves. Internally, it is stored as an integer array
+    over connector ids, which makes composition and inversion cheap.
+
+    NOTE: The swapping tables above are meant to be read as:
+              mirror_mapping[jp] = true_mapping[table[jp]]
+          so to move nodes from True to Mirror, apply the *inverse* of the
+          table: ConnectorPermutation(jp_swapping_mirror).inverse()
+    '''
+
+    def __init__(self, table=None, names=None, perm=None):
+        if table is not None:
+            names = sorted(set(table) | set(table.values()),
+                           key=connector_sort_key)
+            ids = {n: i for i, n in enumerate(names)}
+            perm = [ids[table.get(n, n)] for n in names]
+
+            if len(set(perm)) != len(perm):
+                raise ValueError('Table is not a permutation: {}'.format(table))
+
+        self.names = tuple(names)
+        self.ids = {n: i for i, n in enumerate(self.names)}
+        self.perm = tuple(perm)
+
+        # Flattened lookup table for the hot path
+        self.table = {n: self.names[p] for n, p in zip(self.names, self.perm)}
+
+        self._netname_cache = {}
+        self._node_fields = {}
+
+    def __call__(self, name):
+        return self.table.get(name, name)
+
+    def __eq__(self, other):
+        return isinstance(other, ConnectorPermutation) and \
+            {k: v for k, v in self.table.items() if k != v} == \
+            {k: v for k, v in other.table.items() if k != v}
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.table)
+
+    def extend(self, names):
+        '''
+        Return the permutation array over 'names' (identity on unknown names).
+        '''
+        ids = {n: i for i, n in enumerate(names)}
+        return [ids[self(n)] for n in names]
+
+    def compose(self, other):
+        '''
+        Return self after other, i.e. name -> self(other(name)).
+        '''
+        names = sorted(set(self.names) | set(other.names),
+                       key=connector_sort_key)
+        p_self = self.extend(names)
+        p_other = other.extend(names)
+        return ConnectorPermutation(
+            names=names, perm=[p_self[p_other[i]] for i in range(len(names))])
+
+    def __mul__(self, other):
+        return self.compose(other)
+
+    def inverse(self):
+        perm = [0] * len(self.perm)
+        for i, p in enumerate(self.perm):
+            perm[p] = i
+        return ConnectorPermutation(names=self.names, perm=perm)
+
+    def remap_netname(self, netname):
+        try:
+            return self._netname_cache[netname]
+        except KeyError:
+            table = self.table
+            remapped = '_'.join(table.get(t, t) for t in netname.split('_'))
+            self._netname_cache[netname] = remapped
+            return remapped
+
+    def remap_node(self, node):
+        node_type = type(node)
+
+        try:
+            mask = self._node_fields[node_type]
+        except KeyError:
+            mask = tuple(not f.endswith('_PIN') for f in node_type._fields)
+            self._node_fields[node_type] = mask
+
+        table = self.table
+        return node_type(*[table.get(v, v) if m and v is not None else v
+                           for v, m in zip(node, mask)])
+
+    def remap_nodes(self, nodes):
+        '''
+        Remap a {NetNode: prop} mapping, including the netnames in props.
+        '''
+        result = {}
+        for node, prop in nodes.items():
+            new_prop = dict(prop)
+            if new_prop.get('NETNAME') is not None:
+                new_prop['NETNAME'] = self.remap_netname(new_prop['NETNAME'])
+            result[self.remap_node(node)] = new_prop
+        return result
+
+    def remap_netlist(self, nets):
+        '''
+        Remap a {netname: [(component, pin), ...]} netlist.
+        '''
+        table = self.table
+        return {self.remap_netname(netname):
+                [(table.get(c, c), p) for c, p in components]
+                for netname, components in nets.items()}
+
+
 #############################
 # For YAML/Excel conversion #
 #############################
@@ -355,6 +670,154 @@ def collect_terms(d, filter_function):
     return {k: d[k] for k in filter_function(d)}
 
 
+class RowView(Mapping):
+    '''
+    A zero-copy view of one row of a ColumnTable. Assigning to an existing
+    header writes through to the table.
+    '''
+
+    __slots__ = ('table', 'idx')
+
+    def __init__(self, table, idx):
+        self.table = table
+        self.idx = idx
+
+    def __getitem__(self, header):
+        return self.table.columns[header][self.idx]
+
+    def __setitem__(self, header, value):
+        self.table.columns[header][self.idx] = value
+
+    def __iter__(self):
+        return iter(self.table.columns)
+
+    def __len__(self):
+        return len(self.table.columns)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnTable(object):
+    '''
+    Struct-of-arrays table: one list per header, all of the same length.
+
+    Rows are exposed as RowView objects, which behave like the per-row dicts
+    used elsewhere in this module without copying any data.
+    '''
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns=None):
+        self.columns = {} if columns is None else dict(columns)
+
+        if len(set(map(len, self.columns.values()))) > 1:
+            raise ValueError('Columns have different lengths')
+
+    @classmethod
+    def from_rows(cls, rows):
+        '''
+        Build a table from a list of dicts, e.g. the output of XLReader.
+        Missing fields are filled with None.
+        '''
+        headers = {}
+        for r in rows:
+            for k in r:
+                headers[k] = None
+
+        return cls({h: [r.get(h) for r in rows] for h in headers})
+
+    @classmethod
+    def from_flatten(cls, lst, header='PlaceHolder'):
+        '''
+        Same as ColumnTable.from_rows(flatten(lst, header)), without mutating
+        'lst'.
+        '''
+        keys = [unpack_one_elem_dict(d)[0] for d in lst]
+        table = cls.from_rows([unpack_one_elem_dict(d)[1] for d in lst])
+        table.columns[header] = keys
+        return table
+
+    @classmethod
+    def from_flatten_more(cls, d, header='PlaceHolder'):
+        '''
+        Same as ColumnTable.from_rows(flatten_more(d, header)), without
+        mutating 'd'.
+        '''
+        keys = [k for k, items in d.items() for _ in items]
+        table = cls.from_rows([i for items in d.values() for i in items])
+        table.columns[header] = keys
+        return table
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, header):
+        return self.columns[header]
+
+    def __iter__(self):
+        return (RowView(self, i) for i in range(len(self)))
+
+    def __eq__(self, other):
+        return isinstance(other, ColumnTable) and self.columns == other.columns
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.columns)
+
+    @property
+    def headers(self):
+        return list(self.columns)
+
+    def row(self, idx):
+        return RowView(self, idx)
+
+    def take(self, indices):
+        return ColumnTable({h: [col[i] for i in indices]
+                            for h, col in self.columns.items()})
+
+    def sorted(self, key):
+        indices = sorted(range(len(self)), key=lambda i: key(self.row(i)))
+        return self.take(indices)
+
+    def to_rows(self):
+        '''
+        Return a list of dicts, i.e. the inverse of from_rows.
+        '''
+        headers = self.headers
+        return [dict(zip(headers, values))
+                for values in zip(*self.columns.values())]
+
+    def unflatten(self, header):
+        '''
+        Same as unflatten(self.to_rows(), header), without mutating self.
+        '''
+        headers = [h for h in self.columns if h != header]
+        columns = [self.columns[h] for h in headers]
+        return [{key: dict(zip(headers, values))}
+                for key, *values in zip(self.columns[header], *columns)]
+
+    @staticmethod
+    def unflatten_all(d, header):
+        '''
+        Same as unflatten_all, but for a dict of ColumnTables, e.g. the output
+        of YamlReader.read(columnar=True). The tables are not mutated.
+        '''
+        result = defaultdict(dict)
+        for k, table in d.items():
+            for i in table.unflatten(header):
+                key, prop = unpack_one_elem_dict(i)
+                result[k][key] = prop
+        return result
+
+    def to_sheet(self, headers=None):
+        '''
+        Return [headers, row1, row2, ...], i.e. the sheet format of XLWriter.
+        '''
+        headers = self.headers if headers is None else headers
+        columns = [self.columns[h] for h in headers]
+        return [list(headers)] + [list(r) for r in zip(*columns)]
+
+
 ###########
 # Helpers #
 ###########
@@ -362,3 +825,110 @@ def collect_terms(d, filter_function):
 def split_netname(netname, num_of_split=2):
     conn1, conn2, signal_id = netname.split('_', num_of_split)
     return [conn1, conn2, signal_id]
+
+
+class NetName(object):
+    '''
+    Interned netname, split on first use. The netname 'JD1_JP2_SIGNAL_X' has:
+        parts2:     ('JD1', 'JP2_SIGNAL_X')
+        parts3:     ('JD1', 'JP2', 'SIGNAL_X')
+        connectors: ('JD1', 'JP2')
+
+    Unpacking parts2/parts3 raises ValueError for netnames with too few
+    '_', just like unpacking the result of str.split would.
+
+    Only the 'max_interned' most recently used netnames are kept. The
+    per-node writers (csv_line, netnode_to_netlist, the legacy formatters)
+    split netnames directly instead, as most netnames of a mapping are
+    distinct and would only churn the table.
+    '''
+
+    __slots__ = ('name', '_parts2', '_parts3', '_connectors', '_spliced')
+    _interned = OrderedDict()
+    max_interned = 65536
+
+    def __new__(cls, name):
+        try:
+            self = cls._interned[name]
+            cls._interned.move_to_end(name)
+            return self
+        except KeyError:
+            pass
+
+        self = super().__new__(cls)
+        self.name = name
+        self._parts2 = self._parts3 = self._connectors = self._spliced = None
+
+        self = cls._interned.setdefault(name, self)
+        while len(cls._interned) > cls.max_interned:
+            try:
+                cls._interned.popitem(last=False)
+            except KeyError:
+                break
+
+        return self
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.name)
+
+    @property
+    def parts2(self):
+        if self._parts2 is None:
+            self._parts2 = tuple(self.name.split('_', 1))
+        return self._parts2
+
+    @property
+    def parts3(self):
+        if self._parts3 is None:
+            self._parts3 = tuple(self.name.split('_', 2))
+        return self._parts3
+
+    @property
+    def connectors(self):
+        if self._connectors is None:
+            self._connectors = tuple(
+                t for t in self.name.split('_')
+                if t.startswith('J') and t[-1:].isdigit())
+        return self._connectors
+
+    @property
+    def head(self):
+        return self.parts2[0]
+
+    @property
+    def body(self):
+        return self.parts3[1] if len(self.parts3) == 3 else None
+
+    @property
+    def tail(self):
+        return self.parts3[2] if len(self.parts3) == 3 else None
+
+    def spliced(self, attr):
+        '''
+        Insert 'attr' after the first token, replacing the first '_'.
+        '''
+        if self._spliced is None:
+            self._spliced = {}
+
+        try:
+            return self._spliced[attr]
+        except KeyError:
+            net_head, net_tail = self.parts2
+            result = self._spliced[attr] = net_head + attr + net_tail
+            return result
+
+
+def real_netname(netname, attr):
+    '''
+    Return the netname with the ATTR of a node spliced in.
+    '''
+    if netname is None:
+        return attr
+    elif attr is None:
+        return netname
+    else:
+        net_head, net_tail = netname.split('_', 1)
+        return net_head + attr + net_tail
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 04:45 PM +0200
+
+import threading
+import tracemalloc
+
+from collections import defaultdict, namedtuple
+from functools import wraps
+from time import perf_counter, thread_time
+
+
+#########
+# Spans #
+#########
+
+SpanRecord = namedtuple('SpanRecord', [
+    'name',
+    'start',        # perf_counter() at entry, in s
+    'wall',         # in s
+    'cpu',          # CPU time of the thread, in s
+    'count',        # number of items handled, or None
+    'peak_memory',  # in bytes above the memory at entry, or None
+    'depth',        # nesting level within the thread
+    'thread',
+])
+
+# The installed recorder. When it is None, instrumented functions only pay
+# for a single global lookup.
+recorder = None
+
+
+class Recorder(object):
+    '''
+    Collect spans of instrumented functions while installed:
+
+        with Recorder() as rec:
+            ...
+        rec.to_chrome_trace('trace.json')
+
+    With 'trace_memory', the peak memory of each span is measured with
+    tracemalloc, which slows down the instrumented code considerably. This
+    needs Python >= 3.9; on older versions, peak_memory is always None.
+
+    Recorders can be nested; the enclosing one is reinstalled on exit.
+    '''
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.spans = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started_tracemalloc = False
+        self.previous = None
+
+        # tracemalloc.reset_peak is only available in Python >= 3.9.
+        self.measure_memory = trace_memory and \
+            hasattr(tracemalloc, 'reset_peak')
+
+    def install(self):
+        global recorder
+        self.previous = recorder
+        recorder = self
+
+        if self.measure_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+
+    def uninstall(self):
+        global recorder
+        if recorder is self:
+            recorder = self.previous
+        self.previous = None
+
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *args):
+        self.uninstall()
+
+    @property
+    def stack(self):
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def enter(self):
+        memory = None
+        if self.measure_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the enclosing span before resetting it.
+            if self.stack:
+                self.stack[-1][1] = max(self.stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            memory = [current, current]
+
+        self.stack.append(memory)
+        return perf_counter(), thread_time()
+
+    def exit(self, name, start, count=None):
+        wall_start, cpu_start = start
+        wall = perf_counter() - wall_start
+        cpu = thread_time() - cpu_start
+
+        memory = self.stack.pop()
+        peak_memory = None
+        if memory is not None:
+            peak = max(memory[1], tracemalloc.get_traced_memory()[1])
+            peak_memory = peak - memory[0]
+            if self.stack:
+                self.stack[-1][1] = max(self.stack[-1][1], peak)
+
+        with self.lock:
+            self.spans.append(SpanRecord(
+                name, wall_start, wall, cpu, count, peak_memory,
+                len(self.stack), threading.get_ident()))
+
+    ##########
+    # Output #
+    ##########
+
+    def summary(self):
+        '''
+        Return {name: {'calls', 'wall', 'cpu', 'count', 'peak_memory'}},
+        summed (or maxed, for peak_memory) over all spans of the same name.
+        '''
+        result = defaultdict(lambda: {'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                      'count': 0, 'peak_memory': None})
+        for s in self.spans:
+            entry = result[s.name]
+            entry['calls'] += 1
+            entry['wall'] += s.wall
+            entry['cpu'] += s.cpu
+            if s.count is not None:
+                entry['count'] += s.count
+            if s.peak_memory is not None:
+                entry['peak_memory'] = max(entry['peak_memory'] or 0,
+                                           s.peak_memory)
+        return dict(result)
+
+    def to_json(self, filename):
+        import json
+
+        with open(filename, 'w') as f:
+            json.dump({
+                'spans': [s._asdict() for s in self.spans],
+                'summary': self.summary(),
+            }, f, indent=2)
+
+    def to_chrome_trace(self, filename):
+        '''
+        Write the spans in the Trace Event Format, as read by chrome://tracing
+        and Perfetto.
+        '''
+        import os
+        import json
+
+        pid = os.getpid()
+        events = [{
+            'name': s.name,
+            'ph': 'X',
+            'ts': s.start * 1e6,
+            'dur': s.wall * 1e6,
+            'pid': pid,
+            'tid': s.thread,
+            'args': {'cpu': s.cpu, 'count': s.count,
+                     'peak_memory': s.peak_memory},
+        } for s in self.spans]
+
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+################
+# Entry points #
+################
+
+def instrumented(name=None, count=None):
+    '''
+    Record a span for each call of the decorated function if a recorder is
+    installed. 'count' is called on the return value to get the number of
+    items handled.
+    '''
+    def decorate(func):
+        span_name = name if name is not None else \
+            func.__module__ + '.' + func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            rec = recorder
+            if rec is None:
+                return func(*args, **kwargs)
+
+            start = rec.enter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                rec.exit(span_name, start)
+                raise
+
+            rec.exit(span_name, start,
+                     count(result) if count is not None else None)
+            return result
+
+        return wrapper
+    return decorate
+
+
+class span(object):
+    '''
+    Record a span for a block of code, e.g. one stage of a user script:
+
+        with span('generate') as s:
+            nodes = NetNodeGen().do(nets)
+            s.count = len(nodes)
+    '''
+
+    def __init__(self, name, count=None):
+        self.name = name
+        self.count = count
+        self.rec = None
+
+    def __enter__(self):
+        self.rec = recorder
+        if self.rec is not None:
+            self.start = self.rec.enter()
+        return self
+
+    def __exit__(self, *args):
+        if self.rec is not None:
+            self.rec.exit(self.name, self.start, self.count)
@@ -3,22 +3,31 @@
 # License: BSD 2-clause
 # Last Change: Mon Dec 14, 2020 at 04:00 PM +0100
 
-import openpyxl
+import os
 import re
-import yaml
-
-from pyparsing import nestedExpr
-from collections import defaultdict
+import sys
+import hashlib
+import mmap
+import struct
+
+from array import array
+from collections import defaultdict, namedtuple
+from collections.abc import Mapping, ItemsView
+from copy import deepcopy
 from itertools import zip_longest
 from multipledispatch import dispatch
 from pathlib import Path
 from types import FunctionType
-from openpyxl.worksheet.table import Table, TableStyleInfo
 
 from .datatype import range, ColNum, ExcelCell
-from .datatype import NetNode
+from .datatype import NetNode, GenericNetNode
 from .common import flatten
+from .common import PepiCatalogue
+from .common import real_netname
+from .common import ColumnTable
 from .legacy import PADDING
+from .netlist import IndexedNetlist
+from .instrument import instrumented
 
 
 ##############################
@@ -41,17 +50,7 @@ class ReaderWriter(object):
 ##################
 
 def csv_line(node, prop):
-    s = ''
-    netname = prop['NETNAME']
-    attr = prop['ATTR']
-
-    if netname is None:
-        s += attr
-    elif attr is not None:
-        net_head, net_tail = netname.split('_', 1)
-        s += (net_head + attr + net_tail)
-    else:
-        s += netname
+    s = real_netname(prop['NETNAME'], prop['ATTR'])
     s += ','
 
     # This should be fine as long as 'node' is a list-like structure.
@@ -65,12 +64,14 @@ def csv_line(node, prop):
 
 
 @dispatch((str, Path), dict, FunctionType)
+@instrumented('pyUTM.io.write_to_csv')
 def write_to_csv(filename, data, formatter, **kwargs):
     output = [formatter(k, v) for k, v in data.items()]
     write_to_file(filename, output, **kwargs)
 
 
 @dispatch((str, Path), list, dict)
+@instrumented('pyUTM.io.write_to_csv')
 def write_to_csv(filename, data, headers, **kwargs):
     header_row = [','.join(headers.keys())]
     body = [','.join([str(entry[k]) for _, k in headers.items()])
@@ -79,6 +80,7 @@ def write_to_csv(filename, data, headers, **kwargs):
 
 
 @dispatch((str, Path), list, list)
+@instrumented('pyUTM.io.write_to_csv')
 def write_to_csv(filename, data, headers, **kwargs):
     header_row = [','.join(headers)]
     body = [','.join(map(str, row)) for row in data]
@@ -119,7 +121,9 @@ def prepare_descr_for_xlsx_output(descr):
 
 
 class XLReader(ReaderWriter):
-    def read(self, sheets, cell_range, sortby=None, headers=None):
+    @instrumented(count=lambda sheets: sum(map(len, sheets)))
+    def read(self, sheets, cell_range, sortby=None, headers=None,
+             columnar=False):
         self.sheets = sheets
         self.cell_range = cell_range
         self.initial_col, self.initial_row, self.final_col, self.final_row = \
@@ -128,10 +132,13 @@ class XLReader(ReaderWriter):
         result = []
         # NOTE: The ResourcesWarning is probably due to a lack of encoding in
         # the OS. Ignore it for now.
+        import openpyxl
+
         wb = openpyxl.load_workbook(self.filename, read_only=True)
         for s in self.sheets:
             ws = wb[str(s)]
-            result.append(self.readsheet(ws, sortby=sortby, headers=headers))
+            data = self.readsheet(ws, sortby=sortby, headers=headers)
+            result.append(ColumnTable.from_rows(data) if columnar else data)
         wb.close()
         return result
 
@@ -194,7 +201,10 @@ class XLReader(ReaderWriter):
 
 
 class XLWriter(ReaderWriter):
+    @instrumented()
     def write(self, data, **kwargs):
+        import openpyxl
+
         wb = openpyxl.Workbook()
 
         # Remove the default sheet
@@ -203,6 +213,9 @@ class XLWriter(ReaderWriter):
         for sheet_name, sheet_data in data.items():
             ws = self.create_sheet(wb, sheet_name)
 
+            if isinstance(sheet_data, ColumnTable):
+                sheet_data = sheet_data.to_sheet()
+
             headers = sheet_data[0]
             body = sheet_data[1:]
             self.write_table(ws, sheet_name, headers, body, **kwargs)
@@ -212,12 +225,16 @@ class XLWriter(ReaderWriter):
     @classmethod
     def write_table(cls, ws, table_title, headers, body,
                     initial_row=1, initial_col=ColNum('A'),
-                    table_style=TableStyleInfo(
-                        name='TableStyleMedium2', showFirstColumn=False,
-                        showLastColumn=False, showRowStripes=True,
-                        showColumnStripes=False
-                    )
-                    ):
+                    table_style=None):
+        from openpyxl.worksheet.table import Table, TableStyleInfo
+
+        if table_style is None:
+            table_style = TableStyleInfo(
+                name='TableStyleMedium2', showFirstColumn=False,
+                showLastColumn=False, showRowStripes=True,
+                showColumnStripes=False
+            )
+
         raw_data = [headers] + body
         arranged_data, cell_range = cls.rearrange_table(
             raw_data, initial_row, initial_col)
@@ -268,19 +285,26 @@ class XLWriter(ReaderWriter):
 
 class NestedListReader(ReaderWriter):
     def read(self):
+        from pyparsing import nestedExpr
         return nestedExpr().parseFile(self.filename).asList()[0]
 
 
 class PcadNaiveReader(NestedListReader):
     # Heavily-modified Zishuo's implementation.
-    def read(self, component_postprocessor=lambda x: x.upper()):
+    @instrumented(count=len)
+    def read(self, component_postprocessor=lambda x: x.upper(),
+             indexed=False):
+        # With 'indexed', an IndexedNetlist is returned.
         nets = super().read()
-        all_nets = {}
+        all_nets = IndexedNetlist() if indexed else {}
 
         for net in filter(lambda i: isinstance(i, list) and i[0] == 'net',
                           nets):
             netname = net[1].strip('\"')
-            all_nets[netname] = []
+            if indexed:
+                all_nets.add_net(netname)
+            else:
+                all_nets[netname] = []
 
             for node in \
                     filter(lambda i: isinstance(i, list) and i[0] == 'node',
@@ -289,12 +313,17 @@ class PcadNaiveReader(NestedListReader):
                 component, pin = map(
                     component_postprocessor,
                     map(lambda x: x.strip('\"'), node[1:3]))
-                all_nets[netname].append((component, pin))
+
+                if indexed:
+                    all_nets.add_node(netname, component, pin)
+                else:
+                    all_nets[netname].append((component, pin))
 
         return all_nets
 
 
 class PcadReader(PcadNaiveReader):
+    @instrumented(count=len)
     def read(self, nethopper, **kwargs):
         all_nets = super().read(**kwargs)
         equivalent_nets = nethopper.do(all_nets)
@@ -313,17 +342,75 @@ class PcadReader(PcadNaiveReader):
                 # Now make sure all nets in tail are equivalent to head
                 nets[n] = nets[head]
 
+            if isinstance(nets, IndexedNetlist) and tail:
+                nets.alias(g)
+
 
 ################
 # For wirelist #
 ################
 
 class WirelistNaiveReader(ReaderWriter):
-    def read(self, wire_list_name='Wire List'):
-        with open(self.filename, 'r') as f:
-            raw = f.readlines()
-        trees = self.parse_into_trees(raw)
-        return self.parse_wire_list(trees[wire_list_name])
+    @instrumented(count=len)
+    def read(self, wire_list_name='Wire List', use_mmap=False,
+             encoding='utf-8', indexed=False):
+        # Only the requested section is parsed; all others are skipped on the
+        # fly. With 'indexed', an IndexedNetlist is returned.
+        if not use_mmap:
+            with open(self.filename, 'r', encoding=encoding) as f:
+                return self.parse_section(f, wire_list_name, indexed)
+
+        with open(self.filename, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mmap'ed
+                return {}
+
+            with mm:
+                lines = (line.decode(encoding)
+                         for line in iter(mm.readline, b''))
+                return self.parse_section(lines, wire_list_name, indexed)
+
+    @staticmethod
+    def parse_section(lines, section_name, indexed=False):
+        # NOTE: This is equivalent to
+        #           parse_wire_list(parse_into_trees(lines)[section_name])
+        #       but holds nothing but the requested nets in memory.
+        output = IndexedNetlist() if indexed else {}
+        output_key = None
+        output_ptr = None
+        in_section = section_name == 'Unnamed'
+
+        for line in lines:
+            if line.startswith('<<<'):
+                key = line.replace('<<<', '').replace('>>>', '').strip()
+                in_section = key == section_name
+
+            elif in_section:
+                line = line.strip()
+
+                if not line.startswith('['):
+                    if output_ptr is not None:
+                        fields = line.split()
+                        if len(fields) < 2:
+                            pass
+                        elif indexed:
+                            output.add_node(output_key, fields[0], fields[1])
+                        else:
+                            output_ptr.append((fields[0], fields[1]))
+
+                else:
+                    key = line.replace('[', '').replace(']', '').strip()
+                    key = ' '.join(key.split(' ')[1:])
+                    if indexed:
+                        output.add_net(key)
+                    else:
+                        output[key] = []
+                    output_key = key
+                    output_ptr = output[key]
+
+        return output
 
     @staticmethod
     def parse_into_trees(lines):
@@ -367,18 +454,104 @@ class WirelistNaiveReader(ReaderWriter):
 # For YAML #
 ############
 
+def yaml_loader():
+    import yaml
+
+    # Use libyaml if available
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
 class YamlReader(ReaderWriter):
-    def read(self, flattener=flatten, sortby=None):
-        with open(self.filename) as f:
-            raw = yaml.safe_load(f)
+    # Parsed documents, before post-processing, keyed by file hash.
+    cache = {}
+    cache_size = 32
+
+    @instrumented(count=len)
+    def read(self, flattener=flatten, sortby=None, columnar=False,
+             cache=False):
+        # NOTE: With 'cache', identical files are only parsed once. Each call
+        #       post-processes its own copy, so results can be modified.
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+
+        if cache:
+            key = hashlib.sha1(content).hexdigest()
+            try:
+                raw = deepcopy(self.cache[key])
+            except KeyError:
+                raw = self.load(content)
+                if len(self.cache) >= self.cache_size:
+                    # Evict the oldest entry
+                    del self.cache[next(iter(self.cache))]
+                self.cache[key] = deepcopy(raw)
+        else:
+            raw = self.load(content)
 
         for k in raw.keys():
-            raw[k] = flattener(raw[k])
-            if sortby is not None:
-                raw[k] = sorted(raw[k], key=sortby)
+            raw[k] = self.postprocess(raw[k], flattener, sortby, columnar)
 
         return raw
 
+    @staticmethod
+    def load(content):
+        import yaml
+        return yaml.load(content, Loader=yaml_loader())
+
+    def stream(self, flattener=flatten, sortby=None, columnar=False):
+        '''
+        Yield (key, value) for one top-level key at a time, so that only one
+        value is held in memory.
+
+        NOTE: This uses the pure-Python loader, as the libyaml one doesn't
+              expose node composition.
+        '''
+        import yaml
+
+        with open(self.filename, 'rb') as f:
+            loader = yaml.SafeLoader(f)
+
+            try:
+                loader.get_event()  # Stream start
+                if loader.check_event(yaml.StreamEndEvent):
+                    return
+
+                loader.get_event()  # Document start
+                if not loader.check_event(yaml.MappingStartEvent):
+                    raise ValueError('{}: Top-level node is not a mapping'
+                                     .format(self.filename))
+                loader.get_event()
+
+                while not loader.check_event(yaml.MappingEndEvent):
+                    key = loader.construct_object(
+                        loader.compose_node(None, None), deep=True)
+                    value = loader.construct_object(
+                        loader.compose_node(None, None), deep=True)
+                    loader.constructed_objects = {}
+
+                    yield key, self.postprocess(
+                        value, flattener, sortby, columnar)
+
+            finally:
+                loader.dispose()
+
+    @staticmethod
+    def postprocess(value, flattener, sortby, columnar):
+        value = flattener(value)
+        if sortby is not None:
+            value = sorted(value, key=sortby)
+        if columnar:
+            value = ColumnTable.from_rows(value)
+        return value
+
+
+class PepiYamlReader(ReaderWriter):
+    # The YAML file has the same layout as 'all_pepis'.
+    def read(self):
+        import yaml
+
+        with open(self.filename) as f:
+            return PepiCatalogue(yaml.safe_load(f))
+
 
 ###############
 # For NetNode #
@@ -389,65 +562,96 @@ def netnode_to_netlist(nodes):
 
     for n in nodes.keys():
         prop = nodes[n]
-        netname, attr = prop['NETNAME'], prop['ATTR']
-
-        if netname is None:
-            real_netname = attr
-        elif attr is not None:
-            net_head, net_tail = netname.split('_', 1)
-            real_netname = (net_head + attr + net_tail)
-        else:
-            real_netname = netname
+        netname = real_netname(prop['NETNAME'], prop['ATTR'])
 
         if n.DCB is not None:
-            nets[real_netname].append((n.DCB, n.DCB_PIN))
+            nets[netname].append((n.DCB, n.DCB_PIN))
 
         if n.PT is not None:
-            nets[real_netname].append((n.PT, n.PT_PIN))
+            nets[netname].append((n.PT, n.PT_PIN))
 
     return nets
 
 
 class NetNodeGen(object):
-    def do(self, nets):
-        return self.parse_netlist_dict(nets)
-
-    def parse_netlist_dict(self, all_nets_dict):
+    DCB, PT, OTHER = range(3)
+    DCB_PREFIX = 'JD'
+    PT_PREFIX = 'JP'
+
+    @instrumented(count=len)
+    def do(self, nets, dedupe_aliases=False):
+        return self.parse_netlist_dict(nets, dedupe_aliases)
+
+    def classify(self, component):
+        # Equivalent to matching r'^JD\d+' and r'^JP\d+'
+        for prefix, kind in ((self.DCB_PREFIX, self.DCB),
+                             (self.PT_PREFIX, self.PT)):
+            if component.startswith(prefix) and \
+                    component[len(prefix):len(prefix)+1].isdecimal():
+                return kind
+        return self.OTHER
+
+    def parse_netlist_dict(self, all_nets_dict, dedupe_aliases=False):
+        # NOTE: Equivalent nets from PcadReader share the same list. These
+        #       are only classified once; with 'dedupe_aliases', they are
+        #       only emitted for the first netname of each group.
         net_nodes_dict = {}
+        kinds = {}
+        generated = {}
+
+        for netname, net in all_nets_dict.items():
+            try:
+                _, nodes = generated[id(net)]
+                if dedupe_aliases:
+                    continue
+            except KeyError:
+                nodes = self.net_nodes(net, kinds)
+                # Keep a reference to 'net' so that its id stays unique
+                generated[id(net)] = (net, nodes)
+
+            for n in nodes:
+                net_nodes_dict[n] = {
+                    'NETNAME': netname,
+                    'ATTR': None
+                }
 
-        for netname in all_nets_dict.keys():
-            net = all_nets_dict[netname]
+        return net_nodes_dict
 
-            dcb_nodes = self.find_node_match_regex(net, re.compile(r'^JD\d+'))
-            pt_nodes = self.find_node_match_regex(net, re.compile(r'^JP\d+'))
-            other_nodes = list(
-                set(net) - set(dcb_nodes) - set(pt_nodes)
-            )
+    def net_nodes(self, net, kinds):
+        dcb_nodes, pt_nodes = [], []
+        has_other_nodes = False
+
+        for node in net:
+            component = node[0]
+            try:
+                kind = kinds[component]
+            except KeyError:
+                kind = kinds[component] = self.classify(component)
+
+            if kind == self.DCB:
+                dcb_nodes.append(node)
+            elif kind == self.PT:
+                pt_nodes.append(node)
+            else:
+                has_other_nodes = True
 
-            # First, handle DCB-PT connections
-            if dcb_nodes and pt_nodes:
-                for d, p in zip_longest(dcb_nodes, pt_nodes):
-                    net_nodes_dict[self.net_node_gen(d, p)] = {
-                        'NETNAME': netname,
-                        'ATTR': None
-                    }
-
-            # Now if we do have other components...
-            if other_nodes and dcb_nodes:
-                for d in dcb_nodes:
-                    net_nodes_dict[self.net_node_gen(d, None)] = {
-                        'NETNAME': netname,
-                        'ATTR': None
-                    }
-
-            if other_nodes and pt_nodes:
-                for p in pt_nodes:
-                    net_nodes_dict[self.net_node_gen(None, p)] = {
-                        'NETNAME': netname,
-                        'ATTR': None
-                    }
+        nodes = []
 
-        return net_nodes_dict
+        # First, handle DCB-PT connections
+        if dcb_nodes and pt_nodes:
+            for d, p in zip_longest(dcb_nodes, pt_nodes):
+                nodes.append(self.net_node_gen(d, p))
+
+        # Now if we do have other components...
+        if has_other_nodes and dcb_nodes:
+            for d in dcb_nodes:
+                nodes.append(self.net_node_gen(d, None))
+
+        if has_other_nodes and pt_nodes:
+            for p in pt_nodes:
+                nodes.append(self.net_node_gen(None, p))
+
+        return nodes
 
     @staticmethod
     def net_node_gen(dcb_spec, pt_spec, datatype=NetNode):
@@ -466,3 +670,302 @@ class NetNodeGen(object):
     @staticmethod
     def find_node_match_regex(nodes_list, regex):
         return list(filter(lambda x: regex.search(x[0]), nodes_list))
+
+
+#####################
+# For binary format #
+#####################
+# Layout (all integers are little-endian uint32, except in the header):
+#   header:      magic, version, kind, num_strings, num_node_types,
+#                num_node_fields, num_prop_fields, num_nets, num_records
+#   string ends: num_strings (cumulative end offsets into the string blob)
+#   node types:  num_node_types * (type name, num_node_fields field names)
+#   prop fields: num_prop_fields (string ids)
+#   net table:   num_nets * (name, first record, number of records)
+#   records:     num_records * width (string ids)
+#   string blob: UTF-8
+# For node mappings, each record holds the index of its node type, the node
+# fields and the prop values; for netlists, each record is (component, pin).
+#
+# NOTE: The reader casts the arrays in place, so it only works on platforms
+#       with little-endian 4-byte unsigned ints. The writer byteswaps as
+#       needed and works everywhere.
+
+BINARY_MAGIC = b'PUTM'
+BINARY_VERSION = 2
+BINARY_KIND_NODES = 1
+BINARY_KIND_NETLIST = 2
+BINARY_NONE = 0xFFFFFFFF
+BINARY_HEADER = struct.Struct('<4sHHIIIIII')
+BINARY_UINT32 = struct.Struct('<I')
+BINARY_UINT = 'I' if array('I').itemsize == 4 else 'L'
+BINARY_NATIVE = sys.byteorder == 'little' and \
+    array(BINARY_UINT).itemsize == 4
+
+
+def uint32_bytes(values):
+    arr = array(BINARY_UINT, values)
+    if arr.itemsize != 4:
+        raise ValueError('No 4-byte unsigned int type on this platform')
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class BinaryWriter(ReaderWriter):
+    @instrumented()
+    def write(self, data):
+        # 'data' is either {NetNode: prop} or {netname: [(component, pin)]}.
+        self.strings = {}
+
+        if data and all(isinstance(v, dict) for v in data.values()):
+            kind = BINARY_KIND_NODES
+            node_types, prop_fields, records = self.pack_nodes(data)
+            nets = []
+            num_records = len(data)
+        else:
+            kind = BINARY_KIND_NETLIST
+            node_types, prop_fields = [], []
+            nets, records = self.pack_netlist(data)
+            num_records = len(records) // 2
+
+        num_node_fields = len(node_types[0]._fields) if node_types else 0
+        types = []
+        for datatype in node_types:
+            types.append(self.string_id(datatype.__name__))
+            types.extend(self.string_id(f) for f in datatype._fields)
+        fields = [self.string_id(f) for f in prop_fields]
+
+        blob = bytearray()
+        ends = []
+        for s in self.strings:
+            blob += s.encode('utf-8')
+            ends.append(len(blob))
+
+        with open(self.filename, 'wb') as f:
+            f.write(BINARY_HEADER.pack(
+                BINARY_MAGIC, BINARY_VERSION, kind, len(ends),
+                len(node_types), num_node_fields, len(prop_fields),
+                len(nets) // 3, num_records))
+            for arr in (ends, types, fields, nets, records):
+                f.write(uint32_bytes(arr))
+            f.write(blob)
+
+    def string_id(self, s):
+        if s is None:
+            return BINARY_NONE
+        if not isinstance(s, str):
+            raise TypeError('Only strings and None can be stored: {}'.format(
+                repr(s)))
+
+        s = str(s)
+        try:
+            return self.strings[s]
+        except KeyError:
+            idx = self.strings[s] = len(self.strings)
+            return idx
+
+    def pack_nodes(self, data):
+        # Keys may mix node types, e.g. NetNode and GenericNetNode, as long as
+        # all of them have the same number of fields.
+        node_types = {}
+        prop_fields = {}
+        for node, prop in data.items():
+            if type(node) not in node_types:
+                node_types[type(node)] = len(node_types)
+            for k in prop:
+                prop_fields[k] = None
+        prop_fields = list(prop_fields)
+
+        if len({len(t._fields) for t in node_types}) > 1:
+            raise ValueError('Node types have different numbers of fields: '
+                             '{}'.format(', '.join(
+                                 t.__name__ for t in node_types)))
+
+        records = []
+        for node, prop in data.items():
+            records.append(node_types[type(node)])
+            records.extend(self.string_id(v) for v in node)
+            records.extend(self.string_id(prop.get(k)) for k in prop_fields)
+
+        return list(node_types), prop_fields, records
+
+    def pack_netlist(self, data):
+        nets, records = [], []
+        for netname, components in data.items():
+            nets.extend((self.string_id(netname), len(records) // 2,
+                         len(components)))
+            for component, pin in components:
+                records.extend((self.string_id(component),
+                                self.string_id(pin)))
+        return nets, records
+
+
+class BinaryReader(ReaderWriter):
+    @instrumented()
+    def read(self):
+        # The returned mapping reads records lazily from a read-only mmap.
+        # Call its 'close' method (or use it as a context manager) when done.
+        with open(self.filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < BINARY_HEADER.size:
+                raise ValueError('{}: Not a pyUTM binary file'.format(
+                    self.filename))
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, kind = BINARY_HEADER.unpack_from(mm)[:3]
+            if not BINARY_NATIVE:
+                raise ValueError(
+                    'Reading requires little-endian 4-byte unsigned ints, '
+                    'but this platform is {}-endian'.format(sys.byteorder))
+            if magic != BINARY_MAGIC:
+                raise ValueError('Not a pyUTM binary file')
+            if version != BINARY_VERSION:
+                raise ValueError('Unsupported version {}'.format(version))
+
+            if kind == BINARY_KIND_NODES:
+                return BinaryNodes(mm)
+            else:
+                return BinaryNetlist(mm)
+
+        except ValueError as err:
+            mm.close()
+            raise ValueError('{}: {}'.format(self.filename, err)) from None
+
+
+class BinaryMapping(Mapping):
+    def __init__(self, mm):
+        _, _, _, num_strings, num_node_types, num_node_fields, \
+            num_prop_fields, num_nets, num_records = \
+            BINARY_HEADER.unpack_from(mm)
+        self.num_node_fields = num_node_fields
+        self.num_records = num_records
+
+        self.width = 1 + num_node_fields + num_prop_fields \
+            if num_node_types else 2
+        sizes = (num_strings, num_node_types * (1 + num_node_fields),
+                 num_prop_fields, 3 * num_nets, self.width * num_records)
+
+        # Check the size before taking any views, so that a truncated file
+        # can still be closed.
+        self.blob_offset = BINARY_HEADER.size + 4 * sum(sizes)
+        blob_size = BINARY_UINT32.unpack_from(
+            mm, BINARY_HEADER.size + 4 * (num_strings-1))[0] \
+            if num_strings and self.blob_offset <= len(mm) else 0
+        if self.blob_offset + blob_size > len(mm):
+            raise ValueError('Truncated file')
+
+        self.mm = mm
+        self.buf = memoryview(mm)
+
+        views = []
+        offset = BINARY_HEADER.size
+        for size in sizes:
+            views.append(
+                self.buf[offset:offset+4*size].cast(BINARY_UINT))
+            offset += 4*size
+        self.ends, types, fields, self.nets, self.records = views
+
+        self._strings = {}
+        type_width = 1 + num_node_fields
+        self.node_types = [
+            (self.string(types[i]),
+             tuple(self.string(j) for j in types[i+1:i+type_width]))
+            for i in range(0, len(types), type_width)]
+        self.prop_fields = [self.string(i) for i in fields]
+        types.release()
+        fields.release()
+
+    def string(self, idx):
+        if idx == BINARY_NONE:
+            return None
+
+        try:
+            return self._strings[idx]
+        except KeyError:
+            start = self.blob_offset + (self.ends[idx-1] if idx else 0)
+            end = self.blob_offset + self.ends[idx]
+            s = self._strings[idx] = str(self.buf[start:end], 'utf-8')
+            return s
+
+    def close(self):
+        for view in (self.ends, self.nets, self.records, self.buf):
+            view.release()
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class BinaryNodesItems(ItemsView):
+    # Read records in file order, without building the node index.
+    def __iter__(self):
+        nodes = self._mapping
+        return (nodes.record(idx) for idx in range(nodes.num_records))
+
+
+class BinaryNodes(BinaryMapping):
+    def __init__(self, mm):
+        super().__init__(mm)
+
+        known_types = {t.__name__: t for t in (NetNode, GenericNetNode)}
+        self.datatypes = []
+        for name, fields in self.node_types:
+            datatype = known_types.get(name)
+            if datatype is None or datatype._fields != fields:
+                datatype = namedtuple(name, fields)
+            self.datatypes.append(datatype)
+
+        self._index = None
+
+    def __len__(self):
+        return self.num_records
+
+    def record(self, idx):
+        '''
+        Return the (node, prop) of the idx-th record.
+        '''
+        start = idx * self.width
+        ids = self.records[start:start+self.width]
+        values = [self.string(i) for i in ids[1:]]
+        num = self.num_node_fields
+        return (self.datatypes[ids[0]](*values[:num]),
+                dict(zip(self.prop_fields, values[num:])))
+
+    def __iter__(self):
+        for idx in range(self.num_records):
+            yield self.record(idx)[0]
+
+    def __getitem__(self, node):
+        if self._index is None:
+            self._index = {n: idx for idx, n in enumerate(self)}
+        return self.record(self._index[node])[1]
+
+    def items(self):
+        return BinaryNodesItems(self)
+
+
+class BinaryNetlist(BinaryMapping):
+    def __init__(self, mm):
+        super().__init__(mm)
+        self._index = None
+
+    def __len__(self):
+        return len(self.nets) // 3
+
+    def __iter__(self):
+        for idx in range(0, len(self.nets), 3):
+            yield self.string(self.nets[idx])
+
+    def __getitem__(self, netname):
+        if self._index is None:
+            self._index = {n: idx for idx, n in enumerate(self)}
+        idx = 3 * self._index[netname]
+
+        start, num = self.nets[idx+1], self.nets[idx+2]
+        rec = self.records[2*start:2*(start+num)]
+        return [(self.string(rec[i]), self.string(rec[i+1]))
+                for i in range(0, len(rec), 2)]
@@ -3,9 +3,8 @@
 # License: BSD 2-clause
 # Last Change: Thu May 02, 2019 at 07:48 PM -0400
 
-import re
-
-from copy import deepcopy
+from collections import ChainMap, defaultdict
+from functools import lru_cache
 
 from .common import split_netname
 from .datatype import NetNode
@@ -169,39 +168,108 @@ def legacy_csv_line_pt(node, prop):
 # Data regulator #
 ##################
 
+# Pin names come from a small universe (A1..Z99), so results are memoized.
+PIN_CACHE_SIZE = 4096
+
+
+def split_pin(s):
+    '''
+    Split a pin name into its leading run and the trailing run, e.g.
+    'A12' -> ('A', '12'). This is equivalent to
+        filter(None, re.split(r'(\d+)', s))
+    with the requirement that there are exactly two runs.
+    '''
+    if not s:
+        raise ValueError('Empty pin name')
+
+    leading_digit = s[0].isdecimal()
+    for idx in range(1, len(s)):
+        if s[idx].isdecimal() != leading_digit:
+            break
+    else:
+        raise ValueError('Not a pin name: {}'.format(s))
+
+    for c in s[idx:]:
+        if c.isdecimal() == leading_digit:
+            raise ValueError('Not a pin name: {}'.format(s))
+
+    return s[:idx], s[idx:]
+
+
+@lru_cache(maxsize=PIN_CACHE_SIZE)
+def _padding(s):
+    letter, num = split_pin(s)
+    num = '0'+num if len(num) == 1 else num
+    return letter+num
+
+
+@lru_cache(maxsize=PIN_CACHE_SIZE)
+def _depadding(s):
+    letter, num = split_pin(s)
+    return letter+str(int(num))
+
+
 def PADDING(s):
     if s is None:
         return s
     else:
-        letter, num = filter(None, re.split(r'(\d+)', s))
-        num = '0'+num if len(num) == 1 else num
-        return letter+num
+        return _padding(s)
 
 
 def DEPADDING(s):
     if s is None:
         return s
     else:
-        letter, num = filter(None, re.split(r'(\d+)', s))
-        return letter+str(int(num))
+        return _depadding(s)
+
+
+@lru_cache(maxsize=PIN_CACHE_SIZE)
+def _pinid(s, padder):
+    # NOTE: Cached values must be immutable; they are converted back to lists
+    #       in PINID.
+    if '|' in s:
+        pins = []
+        for pin in s.split('|'):
+            if '/' in pin:
+                pins.append(tuple(map(padder, pin.split('/'))))
+            else:
+                pins.append(padder(pin))
+        return tuple(pins)
+
+    else:
+        return padder(s)
 
 
 def PINID(s, padder=DEPADDING):
     if s is None:
         return s
 
-    if '|' in s:
-        pins = s.split('|')
-        for idx in range(0, len(pins)):
-            if '/' in pins[idx]:
-                pins[idx] = list(map(padder, pins[idx].split('/')))
-            else:
-                pins[idx] = padder(pins[idx])
-
+    pins = _pinid(s, padder)
+    if type(pins) == tuple:
+        return [list(p) if type(p) == tuple else p for p in pins]
     else:
-        pins = padder(s)
+        return pins
+
+
+def PADDING_ALL(pins):
+    '''
+    Apply PADDING to a whole column of pins.
+    '''
+    return [s if s is None else _padding(s) for s in pins]
+
+
+def DEPADDING_ALL(pins):
+    '''
+    Apply DEPADDING to a whole column of pins.
+    '''
+    return [s if s is None else _depadding(s) for s in pins]
+
 
-    return pins
+def PINID_ALL(specs, padder=DEPADDING):
+    '''
+    Apply PINID to a whole column of pin specifications.
+    '''
+    return [PINID(s, padder) for s in specs]
 
 
 def CONID(s, prefix=lambda x: 'JP'+str(int(x))):
@@ -216,22 +284,46 @@ def CONID(s, prefix=lambda x: 'JP'+str(int(x))):
     return connectors
 
 
+def expand_pairs(pins, connectors):
+    '''
+    Return the (connector, pin) pairs of one row. Only if both are lists,
+    they are meshed, and nested pin lists are flattened; otherwise, the row
+    is kept as a single pair.
+    '''
+    if type(pins) == list and type(connectors) == list:
+        return tuple((c, q) for c, p in zip(connectors, pins)
+                     for q in (p if type(p) == list else (p,)))
+    return ((connectors, pins),)
+
+
+def iter_entries(entry, pin_id, connector_id, pins, connectors,
+                 overlay=True):
+    '''
+    Lazily expand one spreadsheet row into one entry per (connector, pin).
+
+    With 'overlay', each entry is a copy-on-write view that only holds the
+    pin and connector fields, sharing all other fields with 'entry'. Writes
+    to the view never affect 'entry'. Otherwise, shallow copies are yielded.
+
+    NOTE: Unlike make_entries, a single pin/connector is yielded as a new
+          entry rather than by updating 'entry' in place.
+    '''
+    for conn, pin in expand_pairs(pins, connectors):
+        if overlay:
+            yield ChainMap({pin_id: pin, connector_id: conn}, entry)
+        else:
+            temp_entry = entry.copy()
+            temp_entry[pin_id] = pin
+            temp_entry[connector_id] = conn
+            yield temp_entry
+
+
 def make_entries(entries, entry, pin_id, connector_id, pins, connectors):
+    # NOTE: The values in an entry are strings (or None), so a shallow copy is
+    #       sufficient.
     if type(pins) == list and type(connectors) == list:
-        mesh = list(zip(connectors, pins))
-        for item in mesh:
-            conn, pin = item
-            if type(pin) == list:
-                for p in pin:
-                    temp_entry = deepcopy(entry)
-                    temp_entry[pin_id] = p
-                    temp_entry[connector_id] = conn
-                    entries.append(temp_entry)
-            else:
-                temp_entry = deepcopy(entry)
-                temp_entry[pin_id] = pin
-                temp_entry[connector_id] = conn
-                entries.append(temp_entry)
+        entries.extend(iter_entries(entry, pin_id, connector_id,
+                                    pins, connectors, overlay=False))
 
     else:
         entry[pin_id] = pins
@@ -239,18 +331,122 @@ def make_entries(entries, entry, pin_id, connector_id, pins, connectors):
         entries.append(entry)
 
 
+def _freeze(value):
+    return tuple(map(_freeze, value)) if type(value) == list else value
+
+
+def _thaw(value):
+    return list(map(_thaw, value)) if type(value) == tuple else value
+
+
+def parse_pin_columns(connector_specs, pin_specs,
+                      prefix=lambda x: 'JP'+str(int(x)), padder=DEPADDING):
+    '''
+    Parse whole connector and pin columns of a sheet in one pass.
+
+    Return three flat, parallel lists: the index of the source row, the
+    connector and the pin of each expanded (connector, pin) pair. Repeated
+    specifications are parsed only once; like PINID, each row still gets its
+    own lists.
+    '''
+    rows, connectors, pins = [], [], []
+    conn_cache, pair_cache = {}, {}
+
+    for row, (conn_spec, pin_spec) in enumerate(
+            zip(connector_specs, pin_specs)):
+        key = (conn_spec, pin_spec)
+
+        try:
+            pairs = pair_cache[key]
+        except KeyError:
+            try:
+                conn = conn_cache[conn_spec]
+            except KeyError:
+                conn = CONID(conn_spec, prefix)
+                conn_cache[conn_spec] = conn
+            pin = PINID(pin_spec, padder)
+
+            # NOTE: Cached pairs must be immutable, as rows share them.
+            pairs = tuple((_freeze(c), _freeze(p))
+                          for c, p in expand_pairs(pin, conn))
+            pair_cache[key] = pairs
+
+        for c, p in pairs:
+            rows.append(row)
+            connectors.append(_thaw(c))
+            pins.append(_thaw(p))
+
+    return rows, connectors, pins
+
+
+def expand_sheet(sheet, pin_id, connector_id,
+                 prefix=lambda x: 'JP'+str(int(x)), padder=DEPADDING,
+                 overlay=False):
+    '''
+    Expand all rows of a sheet read by XLReader into one entry per
+    (connector, pin), using parse_pin_columns.
+    '''
+    rows, connectors, pins = parse_pin_columns(
+        [entry[connector_id] for entry in sheet],
+        [entry[pin_id] for entry in sheet], prefix, padder)
+
+    entries = []
+    for row, conn, pin in zip(rows, connectors, pins):
+        # Each (conn, pin) is already expanded, thus yields a single entry.
+        entries.extend(iter_entries(sheet[row], pin_id, connector_id,
+                                    pin, conn, overlay))
+
+    return entries
+
+
 #############
 # Datatypes #
 #############
 
 class BrkStr(str):
+    # Tokens are computed once, at creation.
+    __slots__ = ('value', 'tokens')
+
     def __new__(cls, s):
         self = super(BrkStr, cls).__new__(cls, s)
         self.value = s
+
+        try:
+            self.tokens = frozenset(split_netname(s))
+        except ValueError:
+            # Not a netname; the error is raised on the first 'in' test.
+            self.tokens = None
+
         return self
 
     def __contains__(self, key):
-        if key in split_netname(self.value):
-            return True
-        else:
-            return False
+        tokens = self.tokens
+        if tokens is None:
+            tokens = split_netname(self.value)
+        return key in tokens
+
+
+class BrkStrIndex(object):
+    '''
+    Inverted index from netname tokens to BrkStr netnames, e.g. to find all
+    nets that mention a given connector.
+    '''
+
+    def __init__(self, netnames=()):
+        self.index = defaultdict(list)
+        for n in netnames:
+            self.add(n)
+
+    def add(self, netname):
+        if not isinstance(netname, BrkStr):
+            netname = BrkStr(netname)
+
+        if netname.tokens is not None:
+            for t in netname.tokens:
+                self.index[t].append(netname)
+
+    def __getitem__(self, token):
+        return self.index.get(token, [])
+
+    def __contains__(self, token):
+        return token in self.index
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 10:12 AM +0200
+
+from collections import defaultdict, namedtuple
+
+
+####################
+# Indexed netlists #
+####################
+
+class IndexedNetlist(dict):
+    '''
+    A netlist, i.e. {netname: [(component, pin), ...]}, that also keeps
+    reverse indexes:
+        node_index:      {(component, pin): [netname, ...]}
+        component_index: {component: {pin: [netname, ...]}}
+
+    Use self.add_net and self.add_node to keep the indexes in sync.
+    '''
+
+    def __init__(self, nets=None):
+        super().__init__()
+        self.node_index = defaultdict(list)
+        self.component_index = defaultdict(lambda: defaultdict(list))
+
+        if nets is not None:
+            for netname, components in nets.items():
+                self.add_net(netname)
+                for component, pin in components:
+                    self.add_node(netname, component, pin)
+
+    def add_net(self, netname):
+        if netname in self:
+            for component, pin in self[netname]:
+                self._unindex(netname, component, pin)
+        self[netname] = []
+
+    def add_node(self, netname, component, pin):
+        self[netname].append((component, pin))
+        self._index(netname, component, pin)
+
+    def _index(self, netname, component, pin):
+        names = self.node_index[(component, pin)]
+        if netname not in names:
+            names.append(netname)
+            self.component_index[component][pin].append(netname)
+
+    def _unindex(self, netname, component, pin):
+        names = self.node_index.get((component, pin), [])
+        if netname in names:
+            names.remove(netname)
+            self.component_index[component][pin].remove(netname)
+
+    def alias(self, names):
+        '''
+        Update the indexes after the nets in 'names' have been made to share
+        one node list, e.g. by PcadReader.
+        '''
+        for component, pin in set(self[names[0]]):
+            for netname in names:
+                self._index(netname, component, pin)
+
+    def nets_of(self, component, pin):
+        return self.node_index.get((component, pin), [])
+
+    def net_of(self, component, pin):
+        '''
+        Return the (first) net that (component, pin) is on, or None.
+        '''
+        names = self.node_index.get((component, pin))
+        return names[0] if names else None
+
+    def pins_of(self, component):
+        '''
+        Return {pin: [netname, ...]} for all pins of 'component'.
+        '''
+        return self.component_index.get(component, {})
+
+
+######################
+# Canonical netlists #
+######################
+
+def default_normalizer(component, pin):
+    return (str(component).upper(), str(pin).upper())
+
+
+def canonical_netlist(nets, normalizer=default_normalizer):
+    '''
+    Convert a netlist of any reader, i.e. {netname: [(component, pin), ...]},
+    to {netname: frozenset of (component, pin)}.
+
+    This works for the output of PcadReader, WirelistNaiveReader and
+    netnode_to_netlist alike.
+    '''
+    return {netname: frozenset(normalizer(c, p) for c, p in components)
+            for netname, components in nets.items()}
+
+
+def fingerprint_netlist(canonical):
+    '''
+    Group nets with identical node sets, e.g. the equivalent nets produced by
+    PcadReader. Return {node_set: [netname, ...]}.
+    '''
+    fingerprints = defaultdict(list)
+    for netname, nodes in canonical.items():
+        fingerprints[nodes].append(netname)
+    return dict(fingerprints)
+
+
+############
+# Net diff #
+############
+
+NetlistDiff = namedtuple('NetlistDiff', [
+    'renamed',  # [(ref_names, new_names)]: same nodes, no common name
+    'missing',  # [ref_names]: none of the nodes exist in new
+    'extra',    # [new_names]: none of the nodes exist in ref
+    'split',    # [(ref_names, [new_names, ...])]
+    'merged',   # [([ref_names, ...], new_names)]
+    'changed',  # [(ref_names, new_names, missing_nodes, extra_nodes)]
+])
+
+
+def is_equivalent(diff):
+    return not any(diff)
+
+
+def diff_netlists(ref, new, normalizer=default_normalizer):
+    '''
+    Compare two netlists in time linear to the total number of nodes.
+
+    Nets are identified by their node sets, thus aliases (nets with identical
+    node sets) are reported together as a list of netnames.
+    The groups of 'split' and 'merged' are sorted by netnames, so that the
+    result doesn't depend on hash randomization.
+    '''
+    ref_fp = fingerprint_netlist(canonical_netlist(ref, normalizer))
+    new_fp = fingerprint_netlist(canonical_netlist(new, normalizer))
+
+    renamed, missing, extra, split, merged, changed = [], [], [], [], [], []
+
+    # Exact matches, by node set
+    for nodes, ref_names in ref_fp.items():
+        new_names = new_fp.get(nodes)
+        if new_names is not None and not set(ref_names) & set(new_names):
+            renamed.append((ref_names, new_names))
+
+    ref_rest = {nodes: names for nodes, names in ref_fp.items()
+                if nodes not in new_fp}
+    new_rest = {nodes: names for nodes, names in new_fp.items()
+                if nodes not in ref_fp}
+
+    ref_node_to_net = {n: nodes for nodes in ref_fp for n in nodes}
+    new_node_to_net = {n: nodes for nodes in new_fp for n in nodes}
+
+    # The ref nets that contribute to each unmatched new net
+    new_sources = {
+        nodes: {ref_node_to_net[n] for n in nodes if n in ref_node_to_net}
+        for nodes in new_rest}
+
+    for nodes, ref_names in ref_rest.items():
+        targets = {new_node_to_net[n] for n in nodes if n in new_node_to_net}
+
+        if not targets:
+            missing.append(ref_names)
+        elif len(targets) > 1:
+            split.append((ref_names, sorted(new_fp[t] for t in targets)))
+        else:
+            target = targets.pop()
+            # Otherwise, this is reported as a merge below.
+            if len(new_sources.get(target, ())) <= 1:
+                changed.append((ref_names, new_fp[target],
+                                nodes - target, target - nodes))
+
+    for nodes, new_names in new_rest.items():
+        sources = new_sources[nodes]
+
+        if not sources:
+            extra.append(new_names)
+        elif len(sources) > 1:
+            merged.append((sorted(ref_fp[s] for s in sources), new_names))
+
+    return NetlistDiff(renamed, missing, extra, split, merged, changed)
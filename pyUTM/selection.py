@@ -7,8 +7,15 @@ from __future__ import annotations
 
 import abc
 
-from collections import defaultdict
-from typing import Union, List, Optional
+from threading import Lock
+from collections import defaultdict, namedtuple
+from time import perf_counter
+from typing import Union, List, Optional, Callable
+
+from .common import all_pepis
+from .netlist import canonical_netlist, fingerprint_netlist
+from .netlist import default_normalizer
+from .instrument import instrumented
 
 
 ########################
@@ -53,26 +60,323 @@ class Selector(metaclass=abc.ABCMeta):
     def __init__(self,
                  dataset: Union[list, dict],
                  rules: List[Rule],
-                 nested: Optional[Selector] = None) -> None:
+                 nested: Optional[Selector] = None,
+                 optimizer: Optional[RuleOrderOptimizer] = None) -> None:
         self.dataset = dataset
         self.rules = rules
 
         # We do allow nested selectors.
         self.nested = nested
 
+        # Optional, opt-in reordering of provably disjoint rules.
+        self.optimizer = optimizer
+
+    def run_context(self,
+                    context: Optional[RunContext] = None
+                    ) -> Optional[RunContext]:
+        '''
+        Return the RunContext of a do() call. Without an explicit 'context',
+        one is only created if hits must be counted for the optimizer or
+        contextual rules need one; otherwise None is returned.
+        '''
+        if context is not None:
+            return context
+        if self.optimizer is not None or \
+                any(getattr(r, 'contextual', False) for r in self.rules):
+            return RunContext()
+        return None
+
+    def ordered_rules(self) -> List[Rule]:
+        if self.optimizer is not None:
+            if self.optimizer.rules != list(self.rules):
+                raise ValueError(
+                    'The optimizer was built for a different list of rules')
+            return self.optimizer.order()
+        else:
+            return self.rules
+
+    def finish(self, run: Optional[RunContext]) -> None:
+        if self.optimizer is not None:
+            self.optimizer.commit(run.hits)
+
     @abc.abstractmethod
-    def do(self, data: Optional[Union[list, dict]] = None) -> Union[list, dict]:
+    def do(self, data: Optional[Union[list, dict]] = None,
+           context: Optional[RunContext] = None) -> Union[list, dict]:
         '''
         Implement loop logic for current selector. Handle nested selector here.
+
+        If 'data' is given, it is processed instead of self.dataset. If
+        'context' is given, all run state lives in it, so that the same
+        selector and rules can be used by concurrent calls.
+        '''
+
+    @abc.abstractmethod
+    def filter_args(self, data=None):
+        '''
+        Yield the argument tuples that self.do passes to Rule.filter.
+        '''
+
+
+###############
+# Run context #
+###############
+
+class RunContext(object):
+    '''
+    Per-invocation state of a Selector.do call.
+
+    Rules must not store run state on themselves (or their class) if they are
+    shared between concurrent calls; they should use self.state instead.
+    '''
+
+    def __init__(self, tracer: Optional[Tracer] = None) -> None:
+        self.tracer = tracer
+        self.hits = defaultdict(int)
+        self.state = defaultdict(dict)
+
+    def hit(self, rule: Rule) -> None:
+        # Hits are counted for the rule itself, not the memoizing wrapper.
+        if isinstance(rule, MemoizedRule):
+            rule = rule.rule
+        self.hits[rule] += 1
+
+    def tracer_for(self, rule: Rule) -> Optional[Tracer]:
+        return self.tracer if self.tracer is not None else rule.tracer
+
+
+###################
+# Rule reordering #
+###################
+
+class RuleOrderOptimizer(object):
+    '''
+    Reorder rules by hit frequency without changing first-match-wins results.
+
+    Two rules may only swap places if they are known to be disjoint, i.e. no
+    entry can be matched by both. Disjointness is either declared via
+    Rule.guard, or inferred from a sample with self.check. Rules that are not
+    known to be disjoint keep their relative order.
+    '''
+
+    def __init__(self, rules: List[Rule]) -> None:
+        self.rules = list(rules)
+        self.hits = {rule: 0 for rule in self.rules}
+
+        num = len(self.rules)
+        self.disjoint = [[self.guarded_disjoint(self.rules[i], self.rules[j])
+                          for j in range(num)] for i in range(num)]
+
+        self._order = None
+        self._lock = Lock()
+
+    @staticmethod
+    def guarded_disjoint(rule1: Rule, rule2: Rule) -> bool:
+        guard1 = getattr(rule1, 'guard', None)
+        guard2 = getattr(rule2, 'guard', None)
+
+        if guard1 is None or guard2 is None or rule1 is rule2:
+            return False
+
+        key1, values1 = guard1
+        key2, values2 = guard2
+        return key1 == key2 and not set(values1) & set(values2)
+
+    def check(self, samples) -> None:
+        '''
+        Mark rule pairs that never match the same sampled entry as disjoint.
+
+        NOTE: This is a heuristic: the sample must be representative.
+        '''
+        matched = [set() for _ in self.rules]
+
+        for idx, args in enumerate(samples):
+            for rule_idx, rule in enumerate(self.rules):
+                match_args = rule.match_args(*args)
+                if rule.contextual:
+                    match_args += (RunContext(),)
+                if rule.match(*match_args):
+                    matched[rule_idx].add(idx)
+
+        num = len(self.rules)
+        for i in range(num):
+            for j in range(num):
+                if i != j and not matched[i] & matched[j]:
+                    self.disjoint[i][j] = True
+
+        self._order = None
+
+    def commit(self, hits: Optional[dict] = None) -> None:
+        '''
+        Add the hits of a finished run, then recompute the rule order.
         '''
+        with self._lock:
+            if hits is not None:
+                for rule, num in hits.items():
+                    self.hits[rule] += num
+            self._order = None
+
+    def order(self) -> List[Rule]:
+        with self._lock:
+            if self._order is None:
+                self._order = self.compute_order()
+            return self._order
+
+    def compute_order(self) -> List[Rule]:
+        # Rule i must stay in front of rule j (i < j) unless they are disjoint.
+        # Among the rules whose predecessors are all placed, greedily pick the
+        # one with most hits, breaking ties by the original position.
+        num = len(self.rules)
+        placed = [False] * num
+        ordered = []
+
+        for _ in range(num):
+            candidates = [j for j in range(num) if not placed[j] and all(
+                placed[i] or self.disjoint[i][j] for i in range(j))]
+            best = min(candidates,
+                       key=lambda j: (-self.hits[self.rules[j]], j))
+            placed[best] = True
+            ordered.append(self.rules[best])
+
+        return ordered
+
+
+###########
+# Tracing #
+###########
+
+TraceEvent = namedtuple('TraceEvent', ['rule', 'node', 'outcome', 'elapsed'])
+
+
+class Tracer(object):
+    '''
+    Report how watched nodes (or nets) are handled by rules.
+
+    A rule only consults its tracer if one is installed, and then only does a
+    single hash lookup per handled node. Events are passed to 'sink', which
+    can be any callable taking a TraceEvent.
+    '''
+
+    def __init__(self, watched=(), sink=None) -> None:
+        self.watched = set(watched)
+        self.sink = sink if sink is not None else self.print_sink
+
+    def watch(self, *nodes) -> None:
+        self.watched.update(nodes)
+
+    def unwatch(self, *nodes) -> None:
+        self.watched.difference_update(nodes)
+
+    def trace(self, rule, node, outcome, start) -> None:
+        if node in self.watched:
+            self.sink(TraceEvent(rule, node, outcome, perf_counter()-start))
+
+    @staticmethod
+    def print_sink(event):
+        print('{} handled by {} in {:.3g} s: {}'.format(
+            event.node, event.rule.__class__.__name__, event.elapsed,
+            event.outcome))
 
 
 #####################################################################
 # Base rule class for both copy-paste-generation and error checking #
 #####################################################################
 
-class RuleBase(Rule):
-    debug_node = None
+class RuleBaseMeta(abc.ABCMeta):
+    # Setting debug_node on a rule class, e.g. 'RulePD.debug_node = node',
+    # installs a Tracer shared by all instances without their own tracer.
+    @property
+    def debug_node(cls):
+        return cls._debug_node
+
+    @debug_node.setter
+    def debug_node(cls, node):
+        cls._debug_node = node
+
+        if node is None:
+            cls.tracer = None
+        else:
+            cls.tracer = Tracer(
+                [node], sink=lambda event: event.rule.debug_sink(event))
+
+
+class RuleBase(Rule, metaclass=RuleBaseMeta):
+    tracer = None
+    _debug_node = None
+    _node_fields = {}
+
+    # If True, the RunContext of the current call is passed as the last
+    # positional argument to self.match and self.process.
+    contextual = False
+
+    # Optional declaration used by RuleOrderOptimizer: a tuple of
+    # (key_name, values), promising that this rule only matches entries whose
+    # 'key_name' is in 'values'.
+    guard = None
+
+    # If True, the rule gives the same result for all variants in a
+    # VariantSweep.
+    variant_independent = False
+
+    @staticmethod
+    def match_args(*args):
+        '''
+        Translate the arguments of self.filter to those of self.match.
+        '''
+        return args
+
+    def dispatch(self, args, context):
+        '''
+        Slow path of self.filter, taken with a RunContext or a tracer: call
+        self.match and self.process with 'args' and, for contextual rules,
+        the context, and report to the tracer.
+        '''
+        if context is None:
+            tracer = self.tracer
+        else:
+            tracer = context.tracer_for(self)
+            if self.contextual:
+                args += (context,)
+
+        if tracer is None:
+            if self.match(*args):
+                return self.process(*args)
+
+        else:
+            start = perf_counter()
+            if self.match(*args):
+                result = self.process(*args)
+                tracer.trace(self, self.traced_node(args, result), result,
+                             start)
+                return result
+
+    @staticmethod
+    def traced_node(args, result):
+        '''
+        Return the node (or net) reported to the tracer.
+        '''
+        return args[0]
+
+    # NOTE: This is kept for backward compatibility. Setting a debug node
+    #       installs a Tracer that watches that single node.
+    @property
+    def debug_node(self):
+        return self._debug_node
+
+    @debug_node.setter
+    def debug_node(self, node):
+        self._debug_node = node
+
+        if node is None:
+            self.tracer = None
+        else:
+            self.tracer = Tracer([node], sink=self.debug_sink)
+
+    def debug_sink(self, event):
+        self.debug_msg(
+            'Node {} is being handled by: {}'.format(
+                self.node_to_str(event.node),
+                event.rule.__class__.__name__)
+        )
 
     @staticmethod
     def debug_msg(msg):
@@ -80,23 +384,24 @@ class RuleBase(Rule):
 
     @classmethod
     def node_to_str(cls, node):
-        attrs = cls.node_data_properties(node)
-
-        s = ''
-        for a in attrs:
-            s += (a + ': ')
-            if getattr(node, a) is not None:
-                s += getattr(node, a)
-            else:
-                s += 'None'
-            s += ', '
+        return ', '.join(
+            '{}: {}'.format(a, getattr(node, a))
+            for a in cls.node_data_properties(node))
 
-        return s[:-2]
+    @classmethod
+    def node_data_properties(cls, node):
+        # Computed once per node type.
+        node_type = type(node)
 
-    @staticmethod
-    def node_data_properties(node):
-        candidate = [attr for attr in dir(node) if not attr.startswith('_')]
-        return [attr for attr in candidate if attr not in ['count', 'index']]
+        try:
+            return cls._node_fields[node_type]
+        except KeyError:
+            candidate = [attr for attr in dir(node)
+                         if not attr.startswith('_')]
+            fields = [attr for attr in candidate
+                      if attr not in ['count', 'index']]
+            cls._node_fields[node_type] = fields
+            return fields
 
 
 ###################################
@@ -108,23 +413,24 @@ class RulePD(RuleBase):
     DCB_PREFIX = 'JD'
     counter = 0
 
-    def filter(self, data, connector):
-        if self.match(data, connector):
-            result = self.process(data, connector)
-
-            # Count number of hits
-            self.counter += 1
-
-            # For debugging
-            if self.debug_node is not None and self.debug_node == result[0]:
-                self.debug_msg(
-                    'Node {} is being handled by: {}'.format(
-                        self.node_to_str(self.debug_node),
-                        self.__class__.__name__)
-                )
+    def filter(self, data, connector, context=None):
+        if context is None and self.tracer is None:
+            if self.match(data, connector):
+                # Count number of hits. With a context, the selector counts
+                # hits in context.hits instead.
+                self.counter += 1
+                return self.process(data, connector)
 
+        else:
+            result = self.dispatch((data, connector), context)
+            if result is not None and context is None:
+                self.counter += 1
             return result
 
+    @staticmethod
+    def traced_node(args, result):
+        return result[0]
+
     @staticmethod
     def prop_gen(netname, note=None, attr=None):
         return {
@@ -135,23 +441,42 @@ class RulePD(RuleBase):
 
 
 class SelectorPD(Selector):
-    def do(self):
+    @instrumented(count=len)
+    def do(self, data=None, context=None):
+        dataset = self.dataset if data is None else data
+        run = self.run_context(context)
+
         processed_dataset = {}
+        rules = self.ordered_rules()
 
-        for connector in self.dataset:
-            for entry in self.dataset[connector]:
-                for rule in self.rules:
-                    result = rule.filter(entry, connector)
+        for connector in dataset:
+            for entry in dataset[connector]:
+                for rule in rules:
+                    result = rule.filter(entry, connector, run)
                     if result is not None:
                         node, prop = result
 
                         # NOTE: The insertion-order is preserved starting in
                         # Python 3.7.0.
                         processed_dataset[node] = prop
+                        if run is not None:
+                            run.hit(rule)
                         break
 
+        if context is None and run is not None:
+            # The caller didn't ask for a context, so keep RulePD.counter.
+            for rule, num in run.hits.items():
+                rule.counter += num
+
+        self.finish(run)
         return processed_dataset
 
+    def filter_args(self, data=None):
+        dataset = self.dataset if data is None else data
+        for connector in dataset:
+            for entry in dataset[connector]:
+                yield (entry, connector)
+
 
 ##########################################
 # Selection rules for schematic checking #
@@ -165,18 +490,17 @@ class RuleNet(RuleBase):
         self.node_list = node_list
         self.reference = reference
 
-        self.debug_node = None
+    @staticmethod
+    def match_args(node, attr):
+        return (node,)
 
-    def filter(self, node, attr):
-        if self.match(node):
-            if self.debug_node is not None and node == self.debug_node:
-                self.debug_msg(
-                    'Node {} is being handled by: {}'.format(
-                        self.node_to_str(self.debug_node),
-                        self.__class__.__name__)
-                )
+    def filter(self, node, attr, context=None):
+        if context is None and self.tracer is None:
+            if self.match(node):
+                return self.process(node)
 
-            return self.process(node)
+        else:
+            return self.dispatch((node,), context)
 
     def process(self, node):
         return self.NETLISTCHECK_PROCESSED_NO_ERROR_FOUND
@@ -185,33 +509,213 @@ class RuleNet(RuleBase):
 class RuleNetlist(RuleNet):
     def __init__(self, ref_netlist=None):
         self.ref_netlist = ref_netlist
+        self._ref_fingerprints = None
 
-    def filter(self, netname, components):
-        if self.match(netname, components):
-            if self.debug_node is not None and netname == self.debug_node:
-                self.debug_msg(
-                    'Net {} is being handled by: {}'.format(
-                        netname,
-                        self.__class__.__name__)
-                )
+    @property
+    def ref_fingerprints(self):
+        # Computed on first use; {node_set: [netname, ...]}.
+        if self._ref_fingerprints is None:
+            self._ref_fingerprints = fingerprint_netlist(
+                canonical_netlist(self.ref_netlist))
+        return self._ref_fingerprints
 
-            return self.process(netname, components)
+    def in_ref(self, netname, components, normalizer=default_normalizer):
+        '''
+        Return the names of the reference nets with the same nodes as this
+        net, or an empty list if there are none.
+        '''
+        nodes = frozenset(normalizer(c, p) for c, p in components)
+        return self.ref_fingerprints.get(nodes, [])
+
+    @staticmethod
+    def match_args(*args):
+        return args
+
+    def debug_sink(self, event):
+        self.debug_msg(
+            'Net {} is being handled by: {}'.format(
+                event.node,
+                event.rule.__class__.__name__)
+        )
+
+    def filter(self, netname, components, context=None):
+        if context is None and self.tracer is None:
+            if self.match(netname, components):
+                return self.process(netname, components)
+
+        else:
+            return self.dispatch((netname, components), context)
 
 
 class SelectorNet(Selector):
-    def do(self):
+    @instrumented(count=lambda result: sum(map(len, result.values())))
+    def do(self, data=None, context=None):
+        dataset = self.dataset if data is None else data
+        run = self.run_context(context)
+
         processed_dataset = defaultdict(list)
+        rules = self.ordered_rules()
 
-        for key, value in self.dataset.items():
-            for rule in self.rules:
-                result = rule.filter(key, value)
+        for key, value in dataset.items():
+            for rule in rules:
+                result = rule.filter(key, value, run)
 
                 if result == RuleNet.NETLISTCHECK_PROCESSED_NO_ERROR_FOUND:
+                    if run is not None:
+                        run.hit(rule)
                     break
 
                 elif result is not None:
                     section, entry = result
                     processed_dataset[section].append(entry)
+                    if run is not None:
+                        run.hit(rule)
                     break
 
+        self.finish(run)
         return processed_dataset
+
+    def filter_args(self, data=None):
+        dataset = self.dataset if data is None else data
+        return iter(dataset.items())
+
+
+#################
+# Variant sweep #
+#################
+
+Variant = namedtuple('Variant', ['pepi', 'name', 'bp_var', 'bp_idx', 'bp_type',
+                                 'staves'])
+
+
+def pepi_variants(pepis=all_pepis):
+    '''
+    Yield one Variant per backplane in each PEPI.
+    '''
+    for pepi, slots in pepis.items():
+        backplanes = defaultdict(list)
+        for slot in slots:
+            backplanes[(slot['bp_var'], slot['bp_idx'], slot['bp_type'])] \
+                .append(slot)
+
+        for (bp_var, bp_idx, bp_type), staves in backplanes.items():
+            yield Variant(pepi, '{}-{}'.format(bp_var, bp_idx),
+                          bp_var, bp_idx, bp_type, staves)
+
+
+class MemoizedRule(RuleBase):
+    '''
+    Wrap a variant-independent rule so that its result for a given entry is
+    computed only once across all variants.
+
+    Contextual rules can't be memoized, as their results may depend on the
+    run state. While a tracer is active, the wrapped rule is always called so
+    that it is traced.
+
+    NOTE: Entries are identified by object identity, so the dataset must be
+          shared (and kept alive) between all variants.
+    '''
+
+    def __init__(self, rule: RuleBase) -> None:
+        if getattr(rule, 'contextual', False):
+            raise ValueError('Contextual rule {} can not be memoized'.format(
+                rule.__class__.__name__))
+
+        self.rule = rule
+        self.cache = {}
+
+    def filter(self, entry, key, context=None):
+        # The RunContext differs between variants, thus is not part of the key.
+        if context is None:
+            tracer = self.rule.tracer
+        else:
+            tracer = context.tracer_for(self.rule)
+
+        if tracer is not None:
+            # Always call the wrapped rule, so that it is traced.
+            result = self.rule.filter(entry, key, context)
+        else:
+            cache_key = (id(entry), id(key))
+            try:
+                result = self.cache[cache_key]
+            except KeyError:
+                result = self.rule.filter(entry, key, context)
+                # NOTE: A concurrent miss only results in the same value being
+                #       computed twice.
+                self.cache[cache_key] = result
+
+        return self.copy_result(result)
+
+    @staticmethod
+    def copy_result(result):
+        # Each variant gets its own prop dict.
+        if isinstance(result, tuple) and len(result) == 2 and \
+                isinstance(result[1], dict):
+            return (result[0], dict(result[1]))
+        return result
+
+    def match(self, *args):
+        return self.rule.match(*args)
+
+    def process(self, *args):
+        return self.rule.process(*args)
+
+    def match_args(self, *args):
+        return self.rule.match_args(*args)
+
+
+class VariantSweep(object):
+    '''
+    Evaluate the rules of each variant on one shared dataset.
+
+    'rule_factory' takes a Variant and returns the list of rules for it.
+    Rules that have 'variant_independent = True' (and are not contextual) and
+    are returned for more than one variant as the very same object are
+    evaluated once per entry.
+
+    NOTE: Variants are run in a thread pool. This is concurrency, not
+          parallelism: pure-Python rules hold the GIL, so the speed-up comes
+          from memoization only.
+    '''
+
+    def __init__(self,
+                 dataset: Union[list, dict],
+                 rule_factory: Callable[[Variant], List[Rule]],
+                 selector: type = None,
+                 variants=None,
+                 max_workers: Optional[int] = None) -> None:
+        self.dataset = dataset
+        self.rule_factory = rule_factory
+        self.selector = SelectorPD if selector is None else selector
+        self.variants = list(pepi_variants() if variants is None
+                             else variants)
+        self.max_workers = max_workers
+
+    @instrumented(count=lambda result: sum(map(len, result.values())))
+    def do(self):
+        memoized = {}
+        jobs = []
+
+        for variant in self.variants:
+            rules = []
+            for rule in self.rule_factory(variant):
+                if getattr(rule, 'variant_independent', False) and \
+                        not getattr(rule, 'contextual', False):
+                    if rule not in memoized:
+                        memoized[rule] = MemoizedRule(rule)
+                    rules.append(memoized[rule])
+                else:
+                    rules.append(rule)
+            jobs.append((variant, self.selector(self.dataset, rules)))
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            results = executor.map(
+                lambda job: job[1].do(context=RunContext()), jobs)
+
+            output = defaultdict(dict)
+            for (variant, _), result in zip(jobs, results):
+                output[variant.pepi][variant.name] = result
+
+        return dict(output)
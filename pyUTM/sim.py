@@ -7,39 +7,53 @@ import re
 
 from collections import defaultdict
 
+from .instrument import instrumented
+
 
 ##########################
 # Current flow simulator #
 ##########################
 
 class CurrentFlow(object):
-    def __init__(self, passable=[r'^R\d+', r'^C\d+', r'^NT\d+']):
+    def __init__(self, passable=[r'^R\d+', r'^C\d+', r'^NT\d+'],
+                 iterative=False, max_nodes=None):
+        # With 'iterative', groups are found with an explicit stack, so there
+        # is no limit on the length of chains. Each group is then limited to
+        # 'max_nodes' nets, if given; the first net of each truncated group
+        # is recorded in self.truncated.
         self.passable = passable
+        self.iterative = iterative
+        self.max_nodes = max_nodes
+        self.truncated = []
 
+    @instrumented(count=len)
     def do(self, nets, max_num_of_recursion=900):
         net_to_comp = self.strip(nets)
         comp_to_net = self.swap_key_to_value(net_to_comp)
         equivalent_nets = []
+        grouped_nets = set()
+        self.truncated = []
 
         for net in net_to_comp.keys():
-            # Always process the first net
-            if len(equivalent_nets) == 0:
-                equivalent_group = self.find_all_flows(
-                    net, net_to_comp, comp_to_net,
-                    max_num_of_recursion=max_num_of_recursion
-                )
-                equivalent_nets.append(equivalent_group)
-
-            # For subsequent nets, only process if it is not in any known group
-            elif True not in map(lambda x: net in x, equivalent_nets):
+            # Only process a net if it is not in any known group
+            if net in grouped_nets:
+                continue
+
+            if self.iterative:
+                # Nets in a truncated group are left to subsequent groups.
+                equivalent_group, truncated = self.find_all_flows_iterative(
+                    net, net_to_comp, comp_to_net, max_nodes=self.max_nodes,
+                    visited=grouped_nets)
+                if truncated:
+                    self.truncated.append(net)
+            else:
                 equivalent_group = self.find_all_flows(
                     net, net_to_comp, comp_to_net,
                     max_num_of_recursion=max_num_of_recursion
                 )
-                equivalent_nets.append(equivalent_group)
 
-            else:
-                pass
+            equivalent_nets.append(equivalent_group)
+            grouped_nets.update(equivalent_group)
 
         return equivalent_nets
 
@@ -92,6 +106,46 @@ class CurrentFlow(object):
 
             return connected_nets
 
+    @staticmethod
+    def find_all_flows_iterative(netname, net_to_comp, comp_to_net,
+                                 max_nodes=None, visited=None):
+        '''
+        Find all nets connected to 'netname' by a depth-first search with an
+        explicit stack. Return (connected_nets, truncated).
+
+        Nets in 'visited' are skipped, and newly found nets are added to it.
+        Each component is only hopped through once, so this takes time linear
+        to the size of the group.
+        '''
+        if visited is None:
+            visited = set()
+
+        connected_nets = [netname]
+        visited.add(netname)
+        hopped_components = set()
+
+        def neighbors(net):
+            for component in net_to_comp[net]:
+                if component not in hopped_components:
+                    hopped_components.add(component)
+                    yield from comp_to_net[component]
+
+        stack = [neighbors(netname)]
+        while stack:
+            net = next(stack[-1], None)
+
+            if net is None:
+                stack.pop()
+            elif net not in visited:
+                if max_nodes is not None and len(connected_nets) >= max_nodes:
+                    return connected_nets, True
+
+                visited.add(net)
+                connected_nets.append(net)
+                stack.append(neighbors(net))
+
+        return connected_nets, False
+
     @staticmethod
     def swap_key_to_value(d):
         converted = defaultdict(list)
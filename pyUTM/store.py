@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 02:25 PM +0200
+
+import json
+import sqlite3
+
+from .datatype import NetNode, GenericNetNode
+
+
+##########
+# Schema #
+##########
+
+# Bump this whenever the schema changes.
+SCHEMA_VERSION = 1
+
+# Nets without nodes are stored as a single row with 'empty' set.
+# The node columns hold the fields of a node in order, e.g. Node1, Node1_PIN,
+# Node2, Node2_PIN for GenericNetNode. 'prop' is the JSON-encoded prop dict.
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS revisions (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nets (
+    revision    INTEGER NOT NULL REFERENCES revisions(id),
+    source      TEXT,
+    position    INTEGER NOT NULL,
+    netname     TEXT NOT NULL,
+    component   TEXT,
+    pin         TEXT,
+    empty       INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    revision    INTEGER NOT NULL REFERENCES revisions(id),
+    position    INTEGER NOT NULL,
+    node_type   TEXT NOT NULL,
+    dcb         TEXT,
+    dcb_pin     TEXT,
+    pt          TEXT,
+    pt_pin      TEXT,
+    netname     TEXT,
+    prop        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nets_revision ON nets(revision, source);
+CREATE INDEX IF NOT EXISTS nets_netname ON nets(netname, revision);
+CREATE INDEX IF NOT EXISTS nets_pin ON nets(component, pin, revision);
+CREATE INDEX IF NOT EXISTS nodes_revision ON nodes(revision);
+CREATE INDEX IF NOT EXISTS nodes_netname ON nodes(netname, revision);
+CREATE INDEX IF NOT EXISTS nodes_dcb ON nodes(dcb, dcb_pin, revision);
+CREATE INDEX IF NOT EXISTS nodes_pt ON nodes(pt, pt_pin, revision);
+'''
+
+NODE_TYPES = {t.__name__: t for t in (NetNode, GenericNetNode)}
+PROP_TYPES = (str, int, float, bool, type(None))
+
+
+#########
+# Store #
+#########
+
+class NetlistStore(object):
+    '''
+    Persistent store for netlists (output of PcadNaiveReader/PcadReader/
+    WirelistNaiveReader) and mappings (output of SelectorPD) of many
+    revisions.
+
+    Revisions are identified by name, and ordered by the time they were
+    first added. Node keys must be NetNode or GenericNetNode, and prop values
+    must be strings, numbers, booleans or None.
+    '''
+
+    def __init__(self, filename=':memory:'):
+        self.conn = sqlite3.connect(str(filename))
+
+        version, = self.conn.execute('PRAGMA user_version').fetchone()
+        num_tables, = self.conn.execute(
+            'SELECT count(*) FROM sqlite_master').fetchone()
+        if num_tables and version != SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError('{}: Unsupported store version {}'.format(
+                filename, version))
+
+        self.conn.executescript(SCHEMA)
+        self.conn.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def revision_id(self, revision, create=False):
+        row = self.conn.execute(
+            'SELECT id FROM revisions WHERE name = ?', (revision,)).fetchone()
+
+        if row is not None:
+            return row[0]
+        elif create:
+            return self.conn.execute(
+                'INSERT INTO revisions(name) VALUES (?)', (revision,)
+            ).lastrowid
+        else:
+            raise KeyError('Unknown revision: {}'.format(revision))
+
+    def revisions(self):
+        return [r for r, in self.conn.execute(
+            'SELECT name FROM revisions ORDER BY id')]
+
+    ###########
+    # Loading #
+    ###########
+
+    def add_netlist(self, revision, nets, source=None):
+        with self.conn:
+            rev = self.revision_id(revision, create=True)
+            self.conn.execute(
+                'DELETE FROM nets WHERE revision = ? AND source IS ?',
+                (rev, source))
+            self.conn.executemany(
+                'INSERT INTO nets VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self.net_rows(rev, source, nets))
+
+    @staticmethod
+    def net_rows(rev, source, nets):
+        for pos, (netname, components) in enumerate(nets.items()):
+            if not components:
+                yield (rev, source, pos, netname, None, None, 1)
+            for component, pin in components:
+                yield (rev, source, pos, netname, component, pin, 0)
+
+    def add_mapping(self, revision, nodes):
+        with self.conn:
+            rev = self.revision_id(revision, create=True)
+            self.conn.execute('DELETE FROM nodes WHERE revision = ?', (rev,))
+            self.conn.executemany(
+                'INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((rev, pos, self.node_type(node)) + tuple(node) +
+                 (prop.get('NETNAME'), self.encode_prop(prop))
+                 for pos, (node, prop) in enumerate(nodes.items())))
+
+    @staticmethod
+    def node_type(node):
+        name = type(node).__name__
+        if NODE_TYPES.get(name) is not type(node):
+            raise TypeError('Unsupported node type: {}'.format(name))
+        return name
+
+    @staticmethod
+    def encode_prop(prop):
+        for k, v in prop.items():
+            if not isinstance(k, str) or not isinstance(v, PROP_TYPES):
+                raise TypeError('Unsupported prop item: {}: {}'.format(
+                    repr(k), repr(v)))
+        return json.dumps(prop)
+
+    @staticmethod
+    def decode_node(node_type, *fields):
+        return NODE_TYPES[node_type](*fields)
+
+    ###########
+    # Queries #
+    ###########
+
+    def netlist(self, revision, source=None):
+        '''
+        Return {netname: [(component, pin), ...]} of a revision.
+        '''
+        nets = {}
+        for netname, component, pin, empty in self.conn.execute(
+                'SELECT netname, component, pin, empty FROM nets '
+                'WHERE revision = ? AND source IS ? ORDER BY rowid',
+                (self.revision_id(revision), source)):
+            components = nets.setdefault(netname, [])
+            if not empty:
+                components.append((component, pin))
+        return nets
+
+    def mapping(self, revision):
+        '''
+        Return {node: prop} of a revision.
+        '''
+        return {self.decode_node(*node): json.loads(prop)
+                for *node, prop in self.conn.execute(
+                    'SELECT node_type, dcb, dcb_pin, pt, pt_pin, prop '
+                    'FROM nodes WHERE revision = ? ORDER BY position',
+                    (self.revision_id(revision),))}
+
+    def nets_of(self, component, pin, revision=None):
+        '''
+        Return [(revision, netname), ...] of all nets that (component, pin)
+        is on, optionally restricted to one revision.
+        '''
+        query = 'SELECT DISTINCT r.name, n.netname, r.id FROM nets n ' \
+            'JOIN revisions r ON n.revision = r.id ' \
+            'WHERE n.component = ? AND n.pin = ?'
+        args = (component, pin)
+
+        if revision is not None:
+            query += ' AND n.revision = ?'
+            args += (self.revision_id(revision),)
+
+        return [(r, n) for r, n, _ in
+                self.conn.execute(query + ' ORDER BY r.id', args)]
+
+    def net_history(self, netname, component, pin):
+        '''
+        Return the revisions in which (component, pin) is on 'netname'.
+        '''
+        return [r for r, in self.conn.execute(
+            'SELECT DISTINCT r.name FROM nets n '
+            'JOIN revisions r ON n.revision = r.id '
+            'WHERE n.netname = ? AND n.component = ? AND n.pin = ? '
+            'ORDER BY r.id', (netname, component, pin))]
+
+    def first_revision(self, netname, component, pin):
+        '''
+        Return the first revision in which (component, pin) is on 'netname',
+        or None.
+        '''
+        history = self.net_history(netname, component, pin)
+        return history[0] if history else None
+
+    def nodes_of(self, netname, revision=None):
+        '''
+        Return [(revision, node, prop), ...] of all mapping entries that
+        have 'netname'.
+        '''
+        query = 'SELECT r.name, node_type, dcb, dcb_pin, pt, pt_pin, prop ' \
+            'FROM nodes n JOIN revisions r ON n.revision = r.id ' \
+            'WHERE n.netname = ?'
+        args = (netname,)
+
+        if revision is not None:
+            query += ' AND n.revision = ?'
+            args += (self.revision_id(revision),)
+
+        return [(r, self.decode_node(*node), json.loads(prop))
+                for r, *node, prop in
+                self.conn.execute(query + ' ORDER BY r.id, n.position', args)]
@@ -5,8 +5,6 @@ import setuptools
 import codecs
 import os.path
 
-from distutils.core import setup
-
 
 ###########
 # Helpers #
@@ -35,7 +33,7 @@ def get_version(rel_path):
 # Setup #
 #########
 
-setup(
+setuptools.setup(
     name='pyUTM',
     version=get_version('pyUTM/__init__.py'),
     author='Yipeng Sun',
@@ -52,6 +50,11 @@ setup(
         'pyyaml',
         'multipledispatch',
     ],
+    entry_points={
+        'console_scripts': [
+            'pyUTM = pyUTM.cli:main',
+        ],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: BSD License',
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 06:10 PM +0200
+
+import unittest
+import shutil
+
+import sys
+sys.path.insert(0, '..')
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pyUTM.cli import run_manifest, load_manifest, main
+from pyUTM.io import PcadReader, NetNodeGen, write_to_csv, csv_line
+from pyUTM.sim import CurrentFlow
+
+MANIFEST = '''
+- input: comet_db.sample.net
+  output: out/comet_db.csv
+- input: true_ppp.sample.wirelist
+  output: out/true_ppp.csv
+  hop: false
+'''
+
+
+class RunManifestTester(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        for f in ('comet_db.sample.net', 'true_ppp.sample.wirelist'):
+            shutil.copy(f, self.dir / f)
+
+        self.manifest = self.dir / 'manifest.yml'
+        self.manifest.write_text(MANIFEST)
+        self.log = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_manifest(self, **kwargs):
+        self.log = []
+        return run_manifest(self.manifest, workers=2, report=self.log.append,
+                            **kwargs)
+
+    def status(self):
+        # In manifest order; skipped jobs are reported first.
+        status = {Path(line.split()[1].rstrip(':')).name: line.split()[0]
+                  for line in self.log[:-1]}
+        return [status['comet_db.csv'], status['true_ppp.csv']]
+
+    def test_load_manifest(self):
+        jobs = load_manifest(self.manifest)
+        self.assertEqual([j['format'] for j in jobs], ['pcad', 'wirelist'])
+        self.assertEqual(jobs[0]['input'],
+                         str(self.dir / 'comet_db.sample.net'))
+
+    def test_unknown_option(self):
+        self.manifest.write_text(MANIFEST + '  hopp: true\n')
+        with self.assertRaises(ValueError):
+            load_manifest(self.manifest)
+
+    def test_same_as_pipeline(self):
+        self.assertEqual(self.run_manifest(), 0)
+        self.assertEqual(self.status(), ['built', 'built'])
+        self.assertIn('hop', [line for line in self.log
+                              if 'comet_db' in line][0])
+
+        nets = PcadReader(str(self.dir / 'comet_db.sample.net')).read(
+            CurrentFlow())
+        write_to_csv(str(self.dir / 'ref.csv'), NetNodeGen().do(nets),
+                     csv_line)
+        self.assertEqual((self.dir / 'out' / 'comet_db.csv').read_text(),
+                         (self.dir / 'ref.csv').read_text())
+
+    def test_skip_up_to_date(self):
+        self.run_manifest()
+        self.run_manifest()
+        self.assertEqual(self.status(), ['skipped', 'skipped'])
+
+        with open(self.dir / 'true_ppp.sample.wirelist', 'a') as f:
+            f.write('\n')
+        self.run_manifest()
+        self.assertEqual(self.status(), ['skipped', 'built'])
+
+        (self.dir / 'out' / 'comet_db.csv').unlink()
+        self.run_manifest()
+        self.assertEqual(self.status(), ['built', 'skipped'])
+
+        self.run_manifest(force=True)
+        self.assertEqual(self.status(), ['built', 'built'])
+
+    def test_failure(self):
+        (self.dir / 'true_ppp.sample.wirelist').unlink()
+        self.assertEqual(self.run_manifest(), 1)
+        self.assertEqual(self.status(), ['built', 'failed'])
+
+    def test_main(self):
+        self.assertEqual(main([str(self.manifest), '-j', '1', '-s',
+                               str(self.dir / 'state.json')]), 0)
+        self.assertTrue((self.dir / 'state.json').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
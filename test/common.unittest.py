@@ -11,7 +11,17 @@ import sys
 sys.path.insert(0, '..')
 
 from pyUTM.common import transpose, flatten, unflatten
+from pyUTM.common import flatten_more, unflatten_all
+from pyUTM.common import ColumnTable
 from pyUTM.common import split_netname
+from pyUTM.common import NetName, real_netname
+from pyUTM.common import ConnectorPermutation
+from pyUTM.common import DepopIndex
+from pyUTM.common import PepiCatalogue, PepiSlot
+from pyUTM.common import jd_depop
+from pyUTM.common import jd_swapping_mirror, jp_swapping_mirror
+from pyUTM.common import jp_depop_true, jp_depop_mirror
+from pyUTM.datatype import NetNode
 
 
 class YamlHelper(unittest.TestCase):
@@ -61,6 +71,61 @@ class YamlHelper(unittest.TestCase):
         )
 
 
+class ColumnTableTester(unittest.TestCase):
+    rows = [{'Tom': 1, 'Tim': 2}, {'Tom': 3, 'Tim': 4}, {'Tom': 5, 'Tim': 6}]
+
+    def test_from_rows(self):
+        table = ColumnTable.from_rows(self.rows)
+        self.assertEqual(table.columns, transpose(self.rows))
+        self.assertEqual(table.to_rows(), self.rows)
+        self.assertEqual(list(table), self.rows)
+
+    def test_row_view(self):
+        table = ColumnTable.from_rows(self.rows)
+        row = table.row(1)
+        self.assertEqual(row['Tim'], 4)
+        row['Tim'] = 8
+        self.assertEqual(table['Tim'], [2, 8, 6])
+
+    def test_flatten_unflatten(self):
+        test_list_dict = [
+            {'Some':  {'A': 1, 'B': 2}},
+            {'Stuff': {'A': 3, 'B': 4}},
+        ]
+        table = ColumnTable.from_flatten(test_list_dict, header='Custom')
+        self.assertEqual(test_list_dict[0], {'Some':  {'A': 1, 'B': 2}})
+        self.assertEqual(table.to_rows(),
+                         flatten(test_list_dict, header='Custom'))
+        self.assertEqual(table.unflatten('Custom'), [
+            {'Some':  {'A': 1, 'B': 2}},
+            {'Stuff': {'A': 3, 'B': 4}},
+        ])
+
+    def test_unflatten_all(self):
+        d = {'JD1': [{'Pin': 'A1', 'A': 1}, {'Pin': 'A2', 'A': 2}],
+             'JD2': [{'Pin': 'B1', 'A': 3}]}
+        tables = {k: ColumnTable.from_rows(v) for k, v in d.items()}
+
+        result = ColumnTable.unflatten_all(tables, 'Pin')
+        self.assertEqual(tables['JD2']['Pin'], ['B1'])
+        self.assertEqual(result, unflatten_all(d, 'Pin'))
+        self.assertEqual(result['JD1']['A2'], {'A': 2})
+
+    def test_flatten_more(self):
+        d = {'JD1': [{'A': 1}, {'A': 2}], 'JD2': [{'A': 3}]}
+        table = ColumnTable.from_flatten_more(d, 'Conn')
+        self.assertEqual(table.to_rows(), flatten_more(d, 'Conn'))
+
+    def test_sorted_and_sheet(self):
+        table = ColumnTable.from_rows(self.rows).sorted(lambda r: -r['Tom'])
+        self.assertEqual(table.to_sheet(['Tim', 'Tom']),
+                         [['Tim', 'Tom'], [6, 5], [4, 3], [2, 1]])
+
+    def test_unequal_columns(self):
+        with self.assertRaises(ValueError):
+            ColumnTable({'A': [1], 'B': [1, 2]})
+
+
 class GenericHelper(unittest.TestCase):
     def test_split_signal_id(self):
         self.assertEqual(
@@ -76,6 +141,156 @@ class GenericHelper(unittest.TestCase):
             ['JP0', 'JT11', 'SOMETHING_ELSE_IF']
         )
 
+    def test_split_signal_id_too_short(self):
+        with self.assertRaises(ValueError):
+            split_netname('JP0_SOMETHING')
+
+
+class NetNameTester(unittest.TestCase):
+    def test_interned(self):
+        self.assertIs(NetName('JD1_JP2_SIGNAL'), NetName('JD1_JP2_SIGNAL'))
+
+    def test_interned_bounded(self):
+        max_interned = NetName.max_interned
+        NetName.max_interned = 2
+        try:
+            first = NetName('JD1_JP2_A')
+            NetName('JD1_JP2_B')
+            NetName('JD1_JP2_A')  # Now the most recently used
+            NetName('JD1_JP2_C')
+
+            self.assertEqual(list(NetName._interned),
+                             ['JD1_JP2_A', 'JD1_JP2_C'])
+            self.assertIs(NetName('JD1_JP2_A'), first)
+        finally:
+            NetName.max_interned = max_interned
+
+    def test_parts(self):
+        name = NetName('JD1_JPL2_SIGNAL_X')
+        self.assertEqual(name.head, 'JD1')
+        self.assertEqual(name.body, 'JPL2')
+        self.assertEqual(name.tail, 'SIGNAL_X')
+        self.assertEqual(name.connectors, ('JD1', 'JPL2'))
+        self.assertEqual(NetName('GND').body, None)
+
+    def test_writers_not_interned(self):
+        real_netname('JD9_JP9_NOT_INTERNED', '_X_')
+        split_netname('JD9_JP9_NOT_INTERNED')
+        self.assertNotIn('JD9_JP9_NOT_INTERNED', NetName._interned)
+
+    def test_real_netname(self):
+        self.assertEqual(real_netname('A_B', '_C_'), 'A_C_B')
+        self.assertEqual(real_netname('A_B', None), 'A_B')
+        self.assertEqual(real_netname(None, 'GND'), 'GND')
+        with self.assertRaises(ValueError):
+            real_netname('AB', '_C_')
+
+
+class ConnectorPermutationTester(unittest.TestCase):
+    def test_call(self):
+        perm = ConnectorPermutation(jd_swapping_mirror)
+        self.assertEqual(perm('JD0'), 'JD4')
+        self.assertEqual(perm('JP0'), 'JP0')
+
+    def test_not_a_permutation(self):
+        with self.assertRaises(ValueError):
+            ConnectorPermutation({'JD0': 'JD1', 'JD2': 'JD1'})
+
+    def test_inverse(self):
+        perm = ConnectorPermutation(jd_swapping_mirror)
+        self.assertEqual(perm.inverse()('JD4'), 'JD0')
+        self.assertEqual(perm * perm.inverse(), ConnectorPermutation({}))
+
+    def test_compose(self):
+        jd = ConnectorPermutation(jd_swapping_mirror)
+        jp = ConnectorPermutation(jp_swapping_mirror)
+        both = jd * jp
+        self.assertEqual(both('JD0'), 'JD4')
+        self.assertEqual(both('JP0'), 'JP2')
+
+    def test_equivalent_to_comprehension(self):
+        perm = ConnectorPermutation(jp_swapping_mirror)
+        self.assertEqual(
+            {jp: jp_depop_true[perm(jp)] for jp in jp_depop_true},
+            jp_depop_mirror)
+
+    def test_remap_nodes(self):
+        perm = ConnectorPermutation(jd_swapping_mirror) * \
+            ConnectorPermutation(jp_swapping_mirror)
+        nodes = {
+            NetNode('JD0', 'A1', 'JP0', 'B1'): {
+                'NETNAME': 'JD0_JP0_SIGNAL', 'NOTE': None, 'ATTR': None},
+            NetNode('JD1', 'A2'): {
+                'NETNAME': 'JD1_GND', 'NOTE': None, 'ATTR': None},
+        }
+        self.assertEqual(perm.remap_nodes(nodes), {
+            NetNode('JD4', 'A1', 'JP2', 'B1'): {
+                'NETNAME': 'JD4_JP2_SIGNAL', 'NOTE': None, 'ATTR': None},
+            NetNode('JD0', 'A2'): {
+                'NETNAME': 'JD0_GND', 'NOTE': None, 'ATTR': None},
+        })
+
+    def test_remap_netlist(self):
+        perm = ConnectorPermutation(jd_swapping_mirror)
+        self.assertEqual(
+            perm.remap_netlist({'JD0_JD1_X': [('JD0', 'A1'), ('R1', '1')]}),
+            {'JD4_JD0_X': [('JD4', 'A1'), ('R1', '1')]})
+
+
+class DepopIndexTester(unittest.TestCase):
+    def test_status(self):
+        index = DepopIndex(jp_depop_true)
+        for jp, status in jp_depop_true.items():
+            for variant, s in status.items():
+                self.assertEqual(index.status(jp, variant), s)
+
+    def test_filter(self):
+        index = DepopIndex(jp_depop_true)
+        nodes = [NetNode('JD0', 'A1', 'JP0', 'B1'),
+                 NetNode('JD0', 'A2', 'JP1', 'B1'),
+                 NetNode('JD0', 'A3', 'JP8', 'B1'),
+                 NetNode('JD0', 'A4')]
+        self.assertEqual(index.filter(nodes, 'P4'), set(nodes) - {nodes[1]})
+        self.assertEqual(index.filter(nodes, 'P2W'), {nodes[3]})
+        self.assertEqual(index.filter_all(nodes)['P1E'], {nodes[3]})
+
+    def test_masks(self):
+        index = DepopIndex(jd_depop)
+        depop, absent = index.masks([NetNode('JD2', 'A1')])[
+            NetNode('JD2', 'A1')]
+        self.assertEqual(index.variants_of(depop), ['P', 'D'])
+        self.assertEqual(absent, 0)
+
+
+class PepiCatalogueTester(unittest.TestCase):
+    catalogue = PepiCatalogue()
+
+    def test_query_single(self):
+        self.assertEqual(
+            [s.pepi for s in self.catalogue.query(stv_ut='UTaX_3C')],
+            ['IP-Bottom-C', 'IP-Top-C'])
+
+    def test_query_composite(self):
+        result = self.catalogue.query(bp_var='gamma', bp_idx='outer',
+                                      bp_type='m')
+        self.assertEqual(len(result), 8)
+        self.assertTrue(all(s.bp_type == 'm' for s in result))
+        self.assertEqual(
+            result, self.catalogue.query(bp_type='m', bp_var='gamma'))
+
+    def test_get(self):
+        self.assertEqual(
+            self.catalogue.get(stv_ut='UTaX_3C', bp_type='t'),
+            PepiSlot('IP-Bottom-C', 'X-2', 'UTaX_3C', 'alpha', 'inner', 't'))
+        with self.assertRaises(KeyError):
+            self.catalogue.get(stv_ut='UTaX_3C')
+
+    def test_frozen(self):
+        with self.assertRaises(AttributeError):
+            self.catalogue.slots = ()
+        with self.assertRaises(ValueError):
+            self.catalogue.query(unknown=1)
+
 
 if __name__ == '__main__':
     unittest.main()
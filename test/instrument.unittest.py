@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 05:05 PM +0200
+
+import unittest
+import json
+import tracemalloc
+
+import sys
+sys.path.insert(0, '..')
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pyUTM.instrument as instrument
+from pyUTM.instrument import Recorder, instrumented, span
+from pyUTM.io import WirelistNaiveReader, NetNodeGen
+from pyUTM.sim import CurrentFlow
+
+
+@instrumented(count=len)
+def make_list(n):
+    return [0] * n
+
+
+@instrumented(name='outer')
+def outer(n):
+    return make_list(n)
+
+
+class RecorderTester(unittest.TestCase):
+    def test_no_recorder(self):
+        self.assertEqual(instrument.recorder, None)
+        self.assertEqual(make_list(3), [0, 0, 0])
+
+    def test_install(self):
+        with Recorder() as rec:
+            self.assertIs(instrument.recorder, rec)
+            make_list(3)
+        self.assertEqual(instrument.recorder, None)
+
+        make_list(4)
+        self.assertEqual(len(rec.spans), 1)
+
+        s = rec.spans[0]
+        self.assertEqual(s.name, '__main__.make_list')
+        self.assertEqual(s.count, 3)
+        self.assertEqual(s.peak_memory, None)
+        self.assertGreaterEqual(s.wall, 0)
+
+    @unittest.skipUnless(hasattr(tracemalloc, 'reset_peak'),
+                         'tracemalloc.reset_peak requires Python >= 3.9')
+    def test_nesting(self):
+        with Recorder(trace_memory=True) as rec:
+            outer(100000)
+
+        inner_span, outer_span = rec.spans
+        self.assertEqual(inner_span.name, '__main__.make_list')
+        self.assertEqual((inner_span.depth, outer_span.depth), (1, 0))
+        self.assertGreaterEqual(inner_span.peak_memory, 100000 * 8)
+        self.assertGreaterEqual(outer_span.peak_memory,
+                                inner_span.peak_memory)
+
+    def test_exception(self):
+        @instrumented()
+        def fail():
+            raise ValueError
+
+        with Recorder() as rec:
+            with self.assertRaises(ValueError):
+                fail()
+            outer(1)
+
+        self.assertEqual([s.depth for s in rec.spans], [0, 1, 0])
+
+    def test_nested_recorders(self):
+        with Recorder() as outer_rec:
+            with Recorder() as inner_rec:
+                make_list(1)
+            self.assertIs(instrument.recorder, outer_rec)
+            make_list(2)
+
+        self.assertEqual(instrument.recorder, None)
+        self.assertEqual([s.count for s in inner_rec.spans], [1])
+        self.assertEqual([s.count for s in outer_rec.spans], [2])
+
+    def test_span(self):
+        with Recorder() as rec:
+            with span('stage') as s:
+                s.count = 2
+
+        self.assertEqual(rec.summary()['stage']['count'], 2)
+
+    def test_pipeline(self):
+        with Recorder() as rec:
+            with span('build'):
+                nets = WirelistNaiveReader(
+                    './true_ppp.sample.wirelist').read()
+                CurrentFlow().do(nets)
+                NetNodeGen().do(nets)
+
+        summary = rec.summary()
+        self.assertEqual(summary['pyUTM.io.WirelistNaiveReader.read']['count'],
+                         len(nets))
+        self.assertIn('pyUTM.sim.CurrentFlow.do', summary)
+        self.assertIn('pyUTM.io.NetNodeGen.do', summary)
+        self.assertEqual(rec.spans[-1].name, 'build')
+
+    def test_output(self):
+        with Recorder() as rec:
+            outer(3)
+
+        with TemporaryDirectory() as tmp:
+            rec.to_json(Path(tmp) / 'spans.json')
+            rec.to_chrome_trace(Path(tmp) / 'trace.json')
+
+            with open(Path(tmp) / 'spans.json') as f:
+                spans = json.load(f)
+            with open(Path(tmp) / 'trace.json') as f:
+                trace = json.load(f)
+
+        self.assertEqual(spans['summary']['outer']['calls'], 1)
+        self.assertEqual([e['name'] for e in trace['traceEvents']],
+                         ['__main__.make_list', 'outer'])
+        self.assertEqual(trace['traceEvents'][0]['ph'], 'X')
+
+
+if __name__ == '__main__':
+    unittest.main()
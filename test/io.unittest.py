@@ -4,8 +4,16 @@
 # Last Change: Mon Dec 14, 2020 at 04:05 PM +0100
 
 import unittest
+import re
+import struct
+import yaml
 # from math import factorial
 
+from tempfile import TemporaryDirectory
+from pathlib import Path
+from itertools import zip_longest
+from unittest.mock import patch
+
 import sys
 sys.path.insert(0, '..')
 
@@ -16,8 +24,13 @@ from pyUTM.io import PcadReader
 from pyUTM.io import netnode_to_netlist
 from pyUTM.io import prepare_descr_for_xlsx_output
 from pyUTM.io import WirelistNaiveReader
+from pyUTM.io import PepiYamlReader
+from pyUTM.io import YamlReader
+from pyUTM.io import NetNodeGen
+from pyUTM.io import BinaryWriter, BinaryReader
+from pyUTM.common import all_pepis
 from pyUTM.datatype import ColNum
-from pyUTM.datatype import NetNode
+from pyUTM.datatype import NetNode, GenericNetNode
 from pyUTM.sim import CurrentFlow
 
 
@@ -95,6 +108,18 @@ class PcadReaderTester(unittest.TestCase):
         self.assertEqual(result['NetD1_1'], result['J1_LOC_TERM'])
         self.assertEqual(result['NetD1_1'], result['J2_LOC_TERM'])
 
+    def test_indexed(self):
+        reader = PcadReader('./comet_db.sample.net')
+        nethopper = CurrentFlow(passable=[r'^W\d+'])
+        reference = reader.read(nethopper=nethopper)
+        result = reader.read(nethopper=nethopper, indexed=True)
+        self.assertEqual(result, reference)
+
+        for netname, components in reference.items():
+            for component, pin in components:
+                self.assertIn(netname, result.nets_of(component, pin))
+                self.assertIn(netname, result.pins_of(component)[pin])
+
 
 class NetNodeToNetListTester(unittest.TestCase):
     def test_dcb_pt_node(self):
@@ -206,6 +231,220 @@ class WirelistNaiveReaderTester(unittest.TestCase):
             [('P6', '15')]
         )
 
+    def test_same_as_tree_parser(self):
+        reader = WirelistNaiveReader('./true_ppp.sample.wirelist')
+        with open('./true_ppp.sample.wirelist') as f:
+            trees = reader.parse_into_trees(f.readlines())
+
+        for section in ['Wire List', 'Component List', 'Unnamed', 'None']:
+            reference = reader.parse_wire_list(trees[section])
+            self.assertEqual(reader.read(section), reference)
+            self.assertEqual(reader.read(section, use_mmap=True), reference)
+            self.assertEqual(reader.read(section, indexed=True), reference)
+
+    def test_indexed(self):
+        reader = WirelistNaiveReader('./true_ppp.sample.wirelist')
+        result = reader.read(indexed=True)
+        self.assertEqual(result.net_of('P6', '15'), 'JP0 JPU0 P1E LV Return')
+
+
+class NetNodeGenTester(unittest.TestCase):
+    nets = {
+        'NET1': [('JD1', 'A1'), ('JP1', 'B1')],
+        'NET2': [('JD1', 'A2'), ('JP1', 'B2'), ('JP2', 'B2'), ('R1', '1')],
+        'NET3': [('JDX', 'A1'), ('JP11', 'B3'), ('JPL1', '1')],
+        'NET4': [('JD2', 'A1'), ('R2', '1')],
+    }
+
+    @staticmethod
+    def reference(nets):
+        gen = NetNodeGen()
+        result = {}
+        for netname, net in nets.items():
+            dcb = gen.find_node_match_regex(net, re.compile(r'^JD\d+'))
+            pt = gen.find_node_match_regex(net, re.compile(r'^JP\d+'))
+            other = set(net) - set(dcb) - set(pt)
+            prop = {'NETNAME': netname, 'ATTR': None}
+            if dcb and pt:
+                for d, p in zip_longest(dcb, pt):
+                    result[gen.net_node_gen(d, p)] = dict(prop)
+            if other and dcb:
+                for d in dcb:
+                    result[gen.net_node_gen(d, None)] = dict(prop)
+            if other and pt:
+                for p in pt:
+                    result[gen.net_node_gen(None, p)] = dict(prop)
+        return result
+
+    def test_same_as_regex(self):
+        result = NetNodeGen().do(self.nets)
+        self.assertEqual(result, self.reference(self.nets))
+        self.assertEqual(list(result), list(self.reference(self.nets)))
+        self.assertIn(NetNode(None, None, 'JP1', 'B2'), result)
+        self.assertNotIn(NetNode('JDX', 'A1'), result)
+
+    def test_aliases(self):
+        nets = dict(self.nets)
+        nets['NET5'] = nets['NET2']
+
+        result = NetNodeGen().do(nets)
+        self.assertEqual(result, self.reference(nets))
+        self.assertEqual(result[NetNode('JD1', 'A2', 'JP1', 'B2')]['NETNAME'],
+                         'NET5')
+
+        result = NetNodeGen().do(nets, dedupe_aliases=True)
+        self.assertEqual(result[NetNode('JD1', 'A2', 'JP1', 'B2')]['NETNAME'],
+                         'NET2')
+
+
+class PepiYamlReaderTester(unittest.TestCase):
+    def test_read(self):
+        with TemporaryDirectory() as tmp:
+            filename = Path(tmp) / 'pepis.yml'
+            with open(filename, 'w') as f:
+                yaml.safe_dump(all_pepis, f)
+
+            catalogue = PepiYamlReader(filename).read()
+            self.assertEqual(len(catalogue),
+                             sum(len(v) for v in all_pepis.values()))
+            self.assertEqual(
+                catalogue.get(stv_ut='UTbV_9A', bp_type='m').pepi,
+                'Magnet-Top-A')
+
+
+class YamlReaderTester(unittest.TestCase):
+    descr = {
+        'JD1': [{'A1': {'Signal': 'S1'}}, {'A2': {'Signal': 'S2'}}],
+        'JD2': [{'B1': {'Signal': 'S3'}}],
+    }
+    flattened = {
+        'JD1': [{'Signal': 'S1', 'PlaceHolder': 'A1'},
+                {'Signal': 'S2', 'PlaceHolder': 'A2'}],
+        'JD2': [{'Signal': 'S3', 'PlaceHolder': 'B1'}],
+    }
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.filename = Path(self.tmp.name) / 'descr.yml'
+        with open(self.filename, 'w') as f:
+            yaml.safe_dump(self.descr, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read(self):
+        self.assertEqual(YamlReader(self.filename).read(), self.flattened)
+
+    def test_cache(self):
+        reader = YamlReader(self.filename)
+        result = reader.read(cache=True)
+        self.assertEqual(result, self.flattened)
+
+        # Modifying a result doesn't affect subsequent reads
+        del result['JD1'][0]['Signal']
+        self.assertEqual(reader.read(cache=True), self.flattened)
+        self.assertEqual(
+            reader.read(flattener=lambda x: x, cache=True), self.descr)
+        self.assertEqual(len(YamlReader.cache), 1)
+
+    def test_stream(self):
+        reader = YamlReader(self.filename)
+        self.assertEqual(dict(reader.stream()), self.flattened)
+
+
+class BinaryFormatTester(unittest.TestCase):
+    nodes = {
+        NetNode('JD1', 'A1', 'JP1', 'B1'):
+        {'NETNAME': 'JD1_JP1_SIG', 'NOTE': None, 'ATTR': None},
+        NetNode('JD1', 'A2'):
+        {'NETNAME': 'JD1_JPL1_SIG', 'NOTE': 'Some note', 'ATTR': '_X_'},
+    }
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.filename = Path(self.tmp.name) / 'output.bin'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_nodes(self):
+        BinaryWriter(self.filename).write(self.nodes)
+        with BinaryReader(self.filename).read() as result:
+            self.assertEqual(len(result), 2)
+            self.assertEqual(dict(result.items()), self.nodes)
+            self.assertEqual(result[NetNode('JD1', 'A2')]['NOTE'],
+                             'Some note')
+            self.assertEqual(result.record(1)[0], NetNode('JD1', 'A2'))
+            self.assertIs(type(result.record(0)[0]), NetNode)
+
+    def test_netlist(self):
+        reader = WirelistNaiveReader('./true_ppp.sample.wirelist')
+        nets = reader.read()
+
+        BinaryWriter(self.filename).write(nets)
+        with BinaryReader(self.filename).read() as result:
+            self.assertEqual(list(result), list(nets))
+            self.assertEqual(result['JD0_JPL0_1V5_Master'],
+                             [('P21', '1'), ('P27', '1'), ('P33', '1')])
+            self.assertEqual(dict(result), nets)
+
+    def test_little_endian(self):
+        BinaryWriter(self.filename).write({'NET': [('R1', '1')]})
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+
+        # Net table and records, followed by the string blob 'NETR11'
+        self.assertEqual(content[-26:],
+                         struct.pack('<5I', 0, 0, 1, 1, 2) + b'NETR11')
+
+    def test_non_native(self):
+        BinaryWriter(self.filename).write(self.nodes)
+        with patch('pyUTM.io.BINARY_NATIVE', False):
+            with self.assertRaises(ValueError):
+                BinaryReader(self.filename).read()
+
+    def test_mixed_node_types(self):
+        nodes = dict(self.nodes)
+        nodes[GenericNetNode('JD1', 'A3', 'JD2', 'A3')] = {
+            'NETNAME': 'JD1_JD2_SIG', 'NOTE': None, 'ATTR': None}
+
+        BinaryWriter(self.filename).write(nodes)
+        with BinaryReader(self.filename).read() as result:
+            self.assertEqual([type(n) for n in result],
+                             [NetNode, NetNode, GenericNetNode])
+            self.assertEqual(dict(result.items()), nodes)
+
+    def test_items_view(self):
+        BinaryWriter(self.filename).write(self.nodes)
+        with BinaryReader(self.filename).read() as result:
+            items = result.items()
+            self.assertEqual(len(items), 2)
+            self.assertIn((NetNode('JD1', 'A2'), self.nodes[
+                NetNode('JD1', 'A2')]), items)
+            self.assertEqual(list(items), list(self.nodes.items()))
+
+    def test_short_file(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'PUTM')
+        with self.assertRaises(ValueError):
+            BinaryReader(self.filename).read()
+
+    def test_truncated_file(self):
+        BinaryWriter(self.filename).write(self.nodes)
+        with open(self.filename, 'rb') as f:
+            content = f.read()
+        with open(self.filename, 'wb') as f:
+            f.write(content[:-1])
+
+        with self.assertRaises(ValueError):
+            BinaryReader(self.filename).read()
+
+    def test_bad_magic(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            BinaryReader(self.filename).read()
+
 
 if __name__ == '__main__':
     unittest.main()
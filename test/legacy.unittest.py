@@ -4,14 +4,18 @@
 # Last Change: Thu May 02, 2019 at 07:49 PM -0400
 
 import unittest
+import re
 
 import sys
 sys.path.insert(0, '..')
 
 from pyUTM.legacy import PADDING, DEPADDING
 from pyUTM.legacy import PINID
+from pyUTM.legacy import PADDING_ALL, DEPADDING_ALL, PINID_ALL
 from pyUTM.legacy import CONID
-from pyUTM.legacy import BrkStr
+from pyUTM.legacy import BrkStr, BrkStrIndex
+from pyUTM.legacy import make_entries, iter_entries
+from pyUTM.legacy import parse_pin_columns, expand_sheet
 
 
 class PadderTester(unittest.TestCase):
@@ -29,6 +33,29 @@ class PadderTester(unittest.TestCase):
     def test_depadding_case2(self):
         self.assertEqual(DEPADDING(None), None)
 
+    def test_same_as_regex(self):
+        def reference(s):
+            letter, num = filter(None, re.split(r'(\d+)', s))
+            return letter, num
+
+        for letter in ['A', 'B', 'Z', 'AB']:
+            for num in ['1', '01', '9', '10', '99', '100']:
+                pin = letter + num
+                ref_letter, ref_num = reference(pin)
+                ref_num = '0'+ref_num if len(ref_num) == 1 else ref_num
+                self.assertEqual(PADDING(pin), ref_letter+ref_num)
+
+    def test_invalid(self):
+        for pin in ['A', '1', 'A1B', '']:
+            with self.assertRaises(ValueError):
+                PADDING(pin)
+
+    def test_padding_all(self):
+        self.assertEqual(PADDING_ALL(['A1', None, 'B11']),
+                         ['A01', None, 'B11'])
+        self.assertEqual(DEPADDING_ALL(['A01', None, 'B11']),
+                         ['A1', None, 'B11'])
+
 
 class PinIdTester(unittest.TestCase):
     def test_nominal(self):
@@ -55,6 +82,15 @@ class PinIdTester(unittest.TestCase):
     def test_two_two_separation(self):
         self.assertEqual(PINID('A1/A2|B2/B3'), [['A1', 'A2'], ['B2', 'B3']])
 
+    def test_cached_result_not_shared(self):
+        pins = PINID('A1/A2|B2')
+        pins[0].append('C1')
+        self.assertEqual(PINID('A1/A2|B2'), [['A1', 'A2'], 'B2'])
+
+    def test_pinid_all(self):
+        self.assertEqual(PINID_ALL(['A01', None, 'A01|B02']),
+                         ['A1', None, ['A1', 'B2']])
+
 
 class ConIdTester(unittest.TestCase):
     def test_nominal(self):
@@ -68,6 +104,89 @@ class ConIdTester(unittest.TestCase):
                          ['JD0', 'JD1'])
 
 
+class MakeEntriesTester(unittest.TestCase):
+    entry = {'Pin': 'A1|B1/B2', 'Conn': '00|01', 'Signal': 'S'}
+    expanded = [
+        {'Pin': 'A1', 'Conn': 'JP0', 'Signal': 'S'},
+        {'Pin': 'B1', 'Conn': 'JP1', 'Signal': 'S'},
+        {'Pin': 'B2', 'Conn': 'JP1', 'Signal': 'S'},
+    ]
+
+    def test_make_entries(self):
+        entries = []
+        entry = dict(self.entry)
+        make_entries(entries, entry, 'Pin', 'Conn',
+                     PINID(entry['Pin']), CONID(entry['Conn']))
+        self.assertEqual(entries, self.expanded)
+        self.assertEqual(entry, self.entry)
+
+    def test_make_entries_single(self):
+        entries = []
+        entry = {'Pin': 'A01', 'Conn': '00 / X-0'}
+        make_entries(entries, entry, 'Pin', 'Conn',
+                     PINID(entry['Pin']), CONID(entry['Conn']))
+        self.assertEqual(entries, [{'Pin': 'A1', 'Conn': 'JP0'}])
+
+    def test_iter_entries_overlay(self):
+        entry = dict(self.entry)
+        entries = list(iter_entries(entry, 'Pin', 'Conn',
+                                    PINID(entry['Pin']), CONID(entry['Conn'])))
+        self.assertEqual(entries, self.expanded)
+
+        entries[0]['Signal'] = 'T'
+        self.assertEqual(entries[0]['Signal'], 'T')
+        self.assertEqual(entries[1]['Signal'], 'S')
+        self.assertEqual(entry, self.entry)
+
+    def test_iter_entries_scalar_connector(self):
+        entry = {'Pin': 'A1|A2', 'Conn': '00 / X'}
+        pins, connectors = PINID(entry['Pin']), CONID(entry['Conn'])
+        reference = []
+        make_entries(reference, dict(entry), 'Pin', 'Conn', pins, connectors)
+
+        self.assertEqual(reference, [{'Pin': ['A1', 'A2'], 'Conn': 'JP0'}])
+        self.assertEqual(list(iter_entries(entry, 'Pin', 'Conn',
+                                           pins, connectors)), reference)
+
+
+class ParsePinColumnsTester(unittest.TestCase):
+    sheet = [
+        {'Pin': 'A01|B01/B02', 'Conn': '00|01'},
+        {'Pin': 'C03', 'Conn': '02 / S-0-M'},
+        {'Pin': 'A1|A2', 'Conn': '00 / X'},
+        {'Pin': None, 'Conn': None},
+        {'Pin': 'A01|B01/B02', 'Conn': '00|01'},
+        {'Pin': 'A1|A2', 'Conn': '00 / X'},
+    ]
+
+    def test_parse(self):
+        rows, connectors, pins = parse_pin_columns(
+            [e['Conn'] for e in self.sheet], [e['Pin'] for e in self.sheet])
+        self.assertEqual(rows, [0, 0, 0, 1, 2, 3, 4, 4, 4, 5])
+        self.assertEqual(connectors,
+                         ['JP0', 'JP1', 'JP1', 'JP2', 'JP0', None,
+                          'JP0', 'JP1', 'JP1', 'JP0'])
+        self.assertEqual(pins, ['A1', 'B1', 'B2', 'C3', ['A1', 'A2'], None,
+                                'A1', 'B1', 'B2', ['A1', 'A2']])
+        self.assertIsNot(pins[4], pins[9])
+
+    def test_same_as_make_entries(self):
+        reference = []
+        for entry in self.sheet:
+            entry = dict(entry)
+            make_entries(reference, entry, 'Pin', 'Conn',
+                         PINID(entry['Pin']), CONID(entry['Conn']))
+
+        self.assertEqual(expand_sheet(self.sheet, 'Pin', 'Conn'), reference)
+        self.assertEqual(expand_sheet(self.sheet, 'Pin', 'Conn',
+                                      overlay=True), reference)
+
+    def test_rows_not_shared(self):
+        entries = expand_sheet(self.sheet, 'Pin', 'Conn')
+        entries[4]['Pin'].append('A3')
+        self.assertEqual(entries[-1]['Pin'], ['A1', 'A2'])
+
+
 class BrkStrTester(unittest.TestCase):
     def test_str_basic_function(self):
         name = BrkStr('name')
@@ -99,6 +218,22 @@ class BrkStrTester(unittest.TestCase):
         self.assertTrue('JPL2' in name3)
         self.assertFalse('JPL3' in name3)
 
+    def test_not_a_netname(self):
+        name = BrkStr('name')
+        with self.assertRaises(ValueError):
+            'name' in name
+
+
+class BrkStrIndexTester(unittest.TestCase):
+    def test_lookup(self):
+        names = ['JP1_JD4_SOME', 'JD4_JD5_OTHER', 'JP2_JD5_SOME', 'GND']
+        index = BrkStrIndex(names)
+        self.assertEqual(index['JD4'], names[:2])
+        self.assertEqual(index['SOME'], [names[0], names[2]])
+        self.assertEqual(index['JD6'], [])
+        self.assertTrue(isinstance(index['JD4'][0], BrkStr))
+        self.assertFalse('GND' in index)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 10:40 AM +0200
+
+import unittest
+
+import sys
+sys.path.insert(0, '..')
+
+from pyUTM.netlist import canonical_netlist, diff_netlists, is_equivalent
+from pyUTM.netlist import IndexedNetlist
+from pyUTM.io import netnode_to_netlist
+from pyUTM.datatype import NetNode
+from pyUTM.selection import RuleNetlist
+
+
+class IndexedNetlistTester(unittest.TestCase):
+    nets = {
+        'NET1': [('JD1', 'A1'), ('R1', '1')],
+        'NET2': [('JD1', 'A2'), ('R1', '2')],
+    }
+
+    def test_lookup(self):
+        netlist = IndexedNetlist(self.nets)
+        self.assertEqual(netlist, self.nets)
+        self.assertEqual(netlist.net_of('JD1', 'A2'), 'NET2')
+        self.assertEqual(netlist.net_of('JD1', 'A3'), None)
+        self.assertEqual(netlist.pins_of('R1'), {'1': ['NET1'], '2': ['NET2']})
+
+    def test_redefine_net(self):
+        netlist = IndexedNetlist(self.nets)
+        netlist.add_net('NET1')
+        netlist.add_node('NET1', 'JD1', 'B1')
+        self.assertEqual(netlist.nets_of('JD1', 'A1'), [])
+        self.assertEqual(netlist.net_of('JD1', 'B1'), 'NET1')
+
+
+class DiffNetlistsTester(unittest.TestCase):
+    ref = {
+        'NET1': [('JD1', 'A1'), ('R1', '1')],
+        'NET2': [('JD1', 'A2'), ('R1', '2')],
+        'NET3': [('JD2', 'A1'), ('JD2', 'A2'), ('JD2', 'A3')],
+        'NET4': [('JD3', 'A1')],
+        'NET5': [('JD4', 'A1'), ('JD4', 'A2')],
+        'NET6': [('JD5', 'A1')],
+        'NET7': [('JD5', 'A2')],
+    }
+
+    def test_canonical(self):
+        self.assertEqual(
+            canonical_netlist({'N': [('jd1', 'a1'), ('JD1', 'A1')]}),
+            {'N': frozenset([('JD1', 'A1')])})
+
+    def test_identical(self):
+        self.assertTrue(is_equivalent(diff_netlists(self.ref, self.ref)))
+
+    def test_netnode_to_netlist(self):
+        nodes = {
+            NetNode('JD1', 'A1', 'JP1', 'A1'):
+            {'NETNAME': 'JD1_JP1_unreal', 'ATTR': None},
+        }
+        ref = {'JD1_JP1_unreal': [('JP1', 'A1'), ('jd1', 'a1')]}
+        self.assertTrue(is_equivalent(
+            diff_netlists(ref, netnode_to_netlist(nodes))))
+
+    def test_differences(self):
+        new = {
+            'NET1': [('JD1', 'A1'), ('R1', '1')],
+            'NET2_RENAMED': [('JD1', 'A2'), ('R1', '2')],
+            'NET3A': [('JD2', 'A1')],
+            'NET3B': [('JD2', 'A2'), ('JD2', 'A3')],
+            'NET5': [('JD4', 'A1'), ('JD4', 'A3')],
+            'NET67': [('JD5', 'A1'), ('JD5', 'A2')],
+            'NET8': [('JD6', 'A1')],
+        }
+        diff = diff_netlists(self.ref, new)
+
+        self.assertEqual(diff.renamed, [(['NET2'], ['NET2_RENAMED'])])
+        self.assertEqual(diff.missing, [['NET4']])
+        self.assertEqual(diff.extra, [['NET8']])
+        self.assertEqual(len(diff.split), 1)
+        self.assertEqual(diff.split[0][0], ['NET3'])
+        self.assertEqual(diff.split[0][1], [['NET3A'], ['NET3B']])
+        self.assertEqual(len(diff.merged), 1)
+        self.assertEqual(diff.merged[0][0], [['NET6'], ['NET7']])
+        self.assertEqual(diff.changed, [
+            (['NET5'], ['NET5'], {('JD4', 'A2')}, {('JD4', 'A3')})])
+
+
+class RuleNetlistInRef(RuleNetlist):
+    def match(self, netname, components):
+        return not self.in_ref(netname, components)
+
+
+class RuleNetlistRefTester(unittest.TestCase):
+    def test_in_ref(self):
+        rule = RuleNetlistInRef(DiffNetlistsTester.ref)
+        self.assertEqual(rule.in_ref('X', [('R1', '1'), ('JD1', 'A1')]),
+                         ['NET1'])
+        self.assertEqual(rule.in_ref('X', [('R1', '1')]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 03:10 PM +0200
+
+import unittest
+import subprocess
+
+import sys
+sys.path.insert(0, '..')
+
+import pyUTM
+
+HEAVY_DEPS = ('openpyxl', 'yaml', 'pyparsing', 'multipledispatch')
+
+
+def run_python(code, *args):
+    return subprocess.run(
+        [sys.executable] + list(args) + ['-c', code], cwd='..',
+        capture_output=True, text=True, check=True)
+
+
+def loaded_modules(code):
+    code += '\nimport sys; print(" ".join(sys.modules))'
+    return set(run_python(code).stdout.split())
+
+
+def import_times(code):
+    '''
+    Return {module: cumulative import time in us}, as reported by
+    'python -X importtime'.
+    '''
+    times = {}
+    for line in run_python(code, '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class LazyImportTester(unittest.TestCase):
+    def test_no_heavy_deps(self):
+        for code in ['import pyUTM',
+                     'from pyUTM.sim import CurrentFlow',
+                     'from pyUTM.datatype import NetNode',
+                     'from pyUTM.selection import SelectorPD']:
+            loaded = loaded_modules(code)
+            self.assertFalse(loaded & set(HEAVY_DEPS), code)
+
+    def test_no_eager_submodules(self):
+        loaded = loaded_modules('import pyUTM')
+        for name in pyUTM.submodules:
+            self.assertNotIn('pyUTM.' + name, loaded)
+
+    def test_attribute_access(self):
+        self.assertEqual(pyUTM.sim.__name__, 'pyUTM.sim')
+        self.assertIn('io', dir(pyUTM))
+
+        with self.assertRaises(AttributeError):
+            pyUTM.nonexistent
+
+    def test_import_time(self):
+        # Compare against the cost of the heavy modules measured in the same
+        # interpreter, so that the check doesn't depend on machine speed.
+        times = import_times('import pyUTM; import pyUTM.io')
+        self.assertLess(times['pyUTM'] * 5, times['pyUTM.io'])
+
+
+if __name__ == '__main__':
+    unittest.main()
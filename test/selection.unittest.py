@@ -5,11 +5,18 @@
 
 import unittest
 
+from concurrent.futures import ThreadPoolExecutor
+
 import sys
 sys.path.insert(0, '..')
 
 from pyUTM.selection import RulePD, SelectorPD
 from pyUTM.selection import RuleNet, SelectorNet
+from pyUTM.selection import RuleOrderOptimizer
+from pyUTM.selection import Tracer
+from pyUTM.selection import RunContext
+from pyUTM.selection import VariantSweep, pepi_variants
+from pyUTM.selection import MemoizedRule
 from pyUTM.datatype import NetNode
 
 
@@ -90,6 +97,297 @@ class RuleNetTester(unittest.TestCase):
             NetNode('JD5', 'A6')) + ' is being handled by: RuleNetDummy'
         )
 
+    def test_tracer(self):
+        dataset = {
+            NetNode('JD1', 'A1'): 1,
+            NetNode('JD2', 'A1'): 1,
+            NetNode('JD5', 'A6'): 1,
+        }
+        events = []
+
+        rule = RuleNetDummy({}, {}, {})
+        rule.tracer = Tracer([NetNode('JD1', 'A1'), NetNode('JD5', 'A6')],
+                             sink=events.append)
+        SelectorNet(dataset, [rule]).do()
+
+        self.assertEqual([e.node for e in events],
+                         [NetNode('JD1', 'A1'), NetNode('JD5', 'A6')])
+        self.assertEqual(events[0].rule, rule)
+        self.assertEqual(
+            events[0].outcome,
+            ('Test', 'Node: DCB: JD1, DCB_PIN: A1, PT: None, PT_PIN: None'))
+        self.assertTrue(events[0].elapsed >= 0)
+
+    def test_class_level_debug_node(self):
+        class RuleNetDebug(RuleNetDummy):
+            pass
+
+        dataset = {NetNode('JD1', 'A1'): 1, NetNode('JD5', 'A6'): 1}
+        rules = [RuleNetDebug({}, {}, {}), RuleNetDebug({}, {}, {})]
+
+        RuleNetDebug.debug_node = NetNode('JD5', 'A6')
+        try:
+            SelectorNet(dataset, rules[:1]).do()
+            SelectorNet(dataset, rules[1:]).do()
+        finally:
+            RuleNetDebug.debug_node = None
+
+        self.assertEqual(RuleNetDebug.tracer, None)
+        msg = 'Node {} is being handled by: RuleNetDebug'.format(
+            RuleNet.node_to_str(NetNode('JD5', 'A6')))
+        for rule in rules:
+            self.assertEqual(rule.last_debug_msg, msg)
+        self.assertEqual(RuleNetDummy.tracer, None)
+
+    def test_no_tracer(self):
+        rule = RuleNetDummy({}, {}, {})
+        rule.debug_node = NetNode('JD5', 'A6')
+        rule.debug_node = None
+        self.assertEqual(rule.tracer, None)
+
+
+class RulePDConnector(RulePD):
+    def __init__(self, connectors):
+        self.connectors = connectors
+        self.guard = ('connector', connectors)
+        self.num_of_calls = 0
+
+    def match(self, data, connector):
+        self.num_of_calls += 1
+        return connector in self.connectors
+
+    def process(self, data, connector):
+        return (
+            NetNode(DCB=connector, DCB_PIN=data),
+            self.prop_gen(netname=self.connectors[0])
+        )
+
+
+class RulePDCatchAll(RulePD):
+    def match(self, data, connector):
+        return True
+
+    def process(self, data, connector):
+        return (
+            NetNode(DCB=connector, DCB_PIN=data),
+            self.prop_gen(netname='CatchAll')
+        )
+
+
+class RuleOrderOptimizerTester(unittest.TestCase):
+    dataset = {'JD0': (1,), 'JD1': (1, 2, 3, 4), 'JD2': (1, 2)}
+
+    def rules(self):
+        return [RulePDConnector(['JD0']), RulePDConnector(['JD1']),
+                RulePDCatchAll()]
+
+    def test_guarded_disjoint(self):
+        rule1, rule2, rule3 = self.rules()
+        self.assertTrue(RuleOrderOptimizer.guarded_disjoint(rule1, rule2))
+        self.assertFalse(RuleOrderOptimizer.guarded_disjoint(rule1, rule3))
+
+    def test_reorder_preserves_result(self):
+        rules = self.rules()
+        reference = SelectorPD(self.dataset, self.rules()).do()
+
+        optimizer = RuleOrderOptimizer(rules)
+        selector = SelectorPD(self.dataset, rules, optimizer=optimizer)
+        self.assertEqual(selector.do(), reference)
+        self.assertEqual(optimizer.order(), [rules[1], rules[0], rules[2]])
+
+        rules[0].num_of_calls = 0
+        self.assertEqual(selector.do(), reference)
+        self.assertEqual(list(selector.do()), list(reference))
+        self.assertEqual(rules[0].num_of_calls, 2*(1+2))
+
+    def test_other_rules(self):
+        rules = self.rules()
+        optimizer = RuleOrderOptimizer(rules[:2])
+        selector = SelectorPD(self.dataset, rules, optimizer=optimizer)
+        with self.assertRaises(ValueError):
+            selector.do()
+
+    def test_sample_check(self):
+        rules = self.rules()
+        for r in rules:
+            r.guard = None
+
+        optimizer = RuleOrderOptimizer(rules)
+        self.assertFalse(optimizer.disjoint[0][1])
+
+        selector = SelectorPD(self.dataset, rules, optimizer=optimizer)
+        optimizer.check(selector.filter_args())
+        self.assertTrue(optimizer.disjoint[0][1])
+        self.assertFalse(optimizer.disjoint[0][2])
+
+
+class RulePDContextual(RulePD):
+    contextual = True
+
+    def match(self, data, connector, context):
+        state = context.state[self]
+        state['seen'] = state.get('seen', 0) + 1
+        return True
+
+    def process(self, data, connector, context):
+        return (
+            NetNode(DCB=connector, DCB_PIN=data),
+            self.prop_gen(netname=context.state[self]['seen'])
+        )
+
+
+class RunContextTester(unittest.TestCase):
+    def test_data_override(self):
+        selector = SelectorPD({}, [RulePDCatchAll()])
+        self.assertEqual(len(selector.do({'JD0': (1, 2)})), 2)
+        self.assertEqual(len(selector.do()), 0)
+
+    def test_hits(self):
+        rule = RulePDCatchAll()
+        context = RunContext()
+        SelectorPD({'JD0': (1, 2), 'JD1': (1,)}, [rule]).do(context=context)
+        self.assertEqual(context.hits[rule], 3)
+        self.assertEqual(rule.counter, 0)
+
+    def test_contextual_without_context(self):
+        result = SelectorPD({'JD0': (1, 2)}, [RulePDContextual()]).do()
+        self.assertEqual([prop['NETNAME'] for prop in result.values()],
+                         [1, 2])
+
+    def test_no_context_needed(self):
+        rule = RulePDCatchAll()
+        selector = SelectorPD({'JD0': (1, 2)}, [rule])
+        self.assertEqual(selector.run_context(), None)
+
+        selector.do()
+        self.assertEqual(rule.counter, 2)
+
+        selector.optimizer = RuleOrderOptimizer([rule])
+        selector.do()
+        self.assertEqual(rule.counter, 4)
+        self.assertEqual(selector.optimizer.hits[rule], 2)
+
+    def test_concurrent(self):
+        rule = RulePDContextual()
+        selector = SelectorPD({}, [rule])
+        datasets = [{'JD{}'.format(i): tuple(range(100))} for i in range(8)]
+
+        def run(dataset):
+            return selector.do(dataset, RunContext())
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(run, datasets))
+
+        for dataset, result in zip(datasets, results):
+            connector = list(dataset)[0]
+            self.assertEqual(
+                [prop['NETNAME'] for prop in result.values()],
+                list(range(1, 101)))
+            self.assertEqual(list(result)[0].DCB, connector)
+
+
+class RulePDCounting(RulePD):
+    variant_independent = True
+
+    def __init__(self):
+        self.num_of_calls = 0
+
+    def match(self, data, connector):
+        self.num_of_calls += 1
+        return connector == 'JD0'
+
+    def process(self, data, connector):
+        return (
+            NetNode(DCB=connector, DCB_PIN=data),
+            self.prop_gen(netname='Shared')
+        )
+
+
+class RulePDVariant(RulePD):
+    def __init__(self, variant):
+        self.variant = variant
+
+    def match(self, data, connector):
+        return True
+
+    def process(self, data, connector):
+        return (
+            NetNode(DCB=connector, DCB_PIN=data),
+            self.prop_gen(netname=self.variant.name)
+        )
+
+
+class VariantSweepTester(unittest.TestCase):
+    def test_pepi_variants(self):
+        variants = list(pepi_variants())
+        self.assertEqual(len(variants), 4*3 + 4*3)
+        self.assertEqual(variants[0].pepi, 'Magnet-Top-C')
+        self.assertEqual(variants[0].name, 'alpha-inner')
+        self.assertEqual(len(variants[0].staves), 6)
+
+    def test_sweep(self):
+        shared = RulePDCounting()
+        dataset = {'JD0': (1, 2), 'JD1': (1,)}
+        sweep = VariantSweep(
+            dataset, lambda v: [shared, RulePDVariant(v)], max_workers=4)
+        result = sweep.do()
+
+        self.assertEqual(shared.num_of_calls, 3)
+        self.assertEqual(
+            result['IP-Top-A']['gamma-outer'][NetNode('JD1', 1)]['NETNAME'],
+            'gamma-outer')
+        self.assertEqual(
+            result['IP-Top-A']['gamma-outer'][NetNode('JD0', 1)]['NETNAME'],
+            'Shared')
+        self.assertEqual(
+            sum(len(v) for v in result.values()), len(list(pepi_variants())))
+
+    def test_props_not_shared(self):
+        shared = RulePDCounting()
+        result = VariantSweep({'JD0': (1,)}, lambda v: [shared]).do()
+
+        variants = result['IP-Top-A']
+        variants['gamma-outer'][NetNode('JD0', 1)]['NETNAME'] = 'Changed'
+        self.assertEqual(
+            variants['alpha-inner'][NetNode('JD0', 1)]['NETNAME'], 'Shared')
+        self.assertEqual(shared.counter, 0)
+
+    def test_contextual(self):
+        class RulePDContextual(RulePDCounting):
+            contextual = True
+
+            def match(self, data, connector, context):
+                context.state[self]['seen'] = True
+                return super().match(data, connector)
+
+            def process(self, data, connector, context):
+                return super().process(data, connector)
+
+        shared = RulePDContextual()
+        result = VariantSweep({'JD0': (1,)}, lambda v: [shared]).do()
+
+        self.assertEqual(shared.num_of_calls, len(list(pepi_variants())))
+        self.assertEqual(
+            result['IP-Top-A']['gamma-outer'][NetNode('JD0', 1)]['NETNAME'],
+            'Shared')
+
+        with self.assertRaises(ValueError):
+            MemoizedRule(shared)
+
+    def test_memoized_hits_and_tracer(self):
+        rule = RulePDCounting()
+        memoized = MemoizedRule(rule)
+        selector = SelectorPD({'JD0': (1, 2)}, [memoized])
+
+        events = []
+        selector.do(context=RunContext())
+        context = RunContext(Tracer([NetNode('JD0', 1)], events.append))
+        selector.do(context=context)
+
+        self.assertEqual(context.hits, {rule: 2})
+        self.assertEqual(rule.num_of_calls, 4)
+        self.assertEqual([e.node for e in events], [NetNode('JD0', 1)])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -155,5 +155,58 @@ class CurrentFlowTester(unittest.TestCase):
         )
 
 
+class CurrentFlowIterativeTester(unittest.TestCase):
+    net_to_comp = {
+        'Net1': ['R1', 'R2'],
+        'Net2': ['R1'],
+        'Net3': ['R3'],
+        'Net4': ['R2', 'R3', 'R4'],
+        'Net5': ['R4', 'R5', 'R6', 'R7', 'R8'],
+        'Net6': ['R5'],
+        'Net7': ['R6'],
+        'Net8': ['R9'],
+    }
+
+    @staticmethod
+    def chain(length):
+        return {'Net{}'.format(i): [('R{}'.format(i), '2'),
+                                    ('R{}'.format(i+1), '1')]
+                for i in range(length)}
+
+    def test_same_as_recursive(self):
+        comp_to_net = CurrentFlow.swap_key_to_value(self.net_to_comp)
+        for net in self.net_to_comp:
+            group, truncated = CurrentFlow.find_all_flows_iterative(
+                net, self.net_to_comp, comp_to_net)
+            self.assertEqual(group[0], net)
+            self.assertFalse(truncated)
+            self.assertEqual(
+                sorted(group),
+                sorted(CurrentFlow.find_all_flows(
+                    net, self.net_to_comp, comp_to_net)))
+
+    def test_do(self):
+        nets = {n: [(c, '1') for c in comps]
+                for n, comps in self.net_to_comp.items()}
+        self.assertEqual(CurrentFlow(iterative=True).do(nets),
+                         CurrentFlow().do(nets))
+
+    def test_long_chain(self):
+        worker = CurrentFlow(iterative=True)
+        groups = worker.do(self.chain(5000))
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(len(groups[0]), 5000)
+        self.assertEqual(worker.truncated, [])
+
+    def test_budget(self):
+        worker = CurrentFlow(iterative=True, max_nodes=300)
+        groups = worker.do(self.chain(1000))
+
+        self.assertEqual(len(groups[0]), 300)
+        self.assertEqual(worker.truncated[0], 'Net0')
+        self.assertEqual(sum(map(len, groups)), 1000)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#
+# License: BSD 2-clause
+# Last Change: Mon Oct 19, 2026 at 02:40 PM +0200
+
+import unittest
+import sqlite3
+
+import sys
+sys.path.insert(0, '..')
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from pyUTM.store import NetlistStore
+from pyUTM.io import WirelistNaiveReader
+from pyUTM.datatype import NetNode, GenericNetNode
+
+
+class NetlistStoreTester(unittest.TestCase):
+    rev1 = {
+        'NET1': [('JD1', 'A1'), ('R1', '1')],
+        'NET2': [('JD1', 'A2'), ('R1', '2')],
+    }
+    rev2 = {
+        'NET1': [('JD1', 'A1'), ('R1', '1'), ('R2', '1')],
+        'NET3': [('JD1', 'A2'), ('R1', '2')],
+        'NET4': [],
+    }
+    mapping = {
+        NetNode('JD1', 'A1', 'JP1', 'B1'): {'NETNAME': 'NET1', 'ATTR': None},
+        NetNode('JD1', 'A2', None, None): {'NETNAME': 'NET2', 'ATTR': '_FRO_'},
+        GenericNetNode('JD1', 'A3', 'JD2', 'A3'):
+        {'NETNAME': 'NET3', 'NOTE': None, 'ATTR': None, 'DEPOP': True},
+    }
+
+    def setUp(self):
+        self.store = NetlistStore()
+        self.store.add_netlist('rev1', self.rev1)
+        self.store.add_netlist('rev2', self.rev2)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_round_trip(self):
+        self.assertEqual(self.store.revisions(), ['rev1', 'rev2'])
+        self.assertEqual(self.store.netlist('rev1'), self.rev1)
+        self.assertEqual(self.store.netlist('rev2'), self.rev2)
+
+    def test_reload_replaces(self):
+        self.store.add_netlist('rev1', self.rev2)
+        self.assertEqual(self.store.netlist('rev1'), self.rev2)
+        self.assertEqual(self.store.revisions(), ['rev1', 'rev2'])
+
+    def test_unknown_revision(self):
+        with self.assertRaises(KeyError):
+            self.store.netlist('rev3')
+
+    def test_nets_of(self):
+        self.assertEqual(self.store.nets_of('JD1', 'A2'),
+                         [('rev1', 'NET2'), ('rev2', 'NET3')])
+        self.assertEqual(self.store.nets_of('JD1', 'A2', 'rev2'),
+                         [('rev2', 'NET3')])
+
+    def test_history(self):
+        self.assertEqual(self.store.net_history('NET1', 'R1', '1'),
+                         ['rev1', 'rev2'])
+        self.assertEqual(self.store.first_revision('NET1', 'R2', '1'), 'rev2')
+        self.assertEqual(self.store.first_revision('NET2', 'R2', '1'), None)
+
+    def test_mapping(self):
+        self.store.add_mapping('rev1', self.mapping)
+        result = self.store.mapping('rev1')
+
+        self.assertEqual(result, self.mapping)
+        self.assertEqual([type(n) for n in result],
+                         [NetNode, NetNode, GenericNetNode])
+        self.assertEqual(
+            self.store.nodes_of('NET1'),
+            [('rev1', NetNode('JD1', 'A1', 'JP1', 'B1'),
+              {'NETNAME': 'NET1', 'ATTR': None})])
+
+    def test_unsupported_mapping(self):
+        with self.assertRaises(TypeError):
+            self.store.add_mapping('rev1', {
+                NetNode('JD1', 'A1'): {'NETNAME': 'NET1', 'ATTR': ('_X_',)}})
+        self.assertEqual(self.store.mapping('rev1'), {})
+
+    def test_wirelist_on_disk(self):
+        nets = WirelistNaiveReader('./true_ppp.sample.wirelist').read()
+
+        with TemporaryDirectory() as tmp:
+            filename = Path(tmp) / 'netlists.db'
+            with NetlistStore(filename) as store:
+                store.add_netlist('true_ppp', nets)
+
+            with NetlistStore(filename) as store:
+                self.assertEqual(store.netlist('true_ppp'), nets)
+
+
+    def test_old_schema(self):
+        with TemporaryDirectory() as tmp:
+            filename = Path(tmp) / 'netlists.db'
+            conn = sqlite3.connect(str(filename))
+            conn.execute('CREATE TABLE nets (netname TEXT)')
+            conn.close()
+
+            with self.assertRaises(ValueError):
+                NetlistStore(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()